@@ -1,4 +1,6 @@
+import hmac
 import os
+import sys
 from datetime import datetime, date, time as dtime
 from typing import Optional
 from flask import (
@@ -11,13 +13,16 @@ from flask_login import (
     logout_user, login_required, current_user
 )
 from sqlalchemy import text, inspect
-from werkzeug.security import generate_password_hash, check_password_hash
 
 
 # -------------------------------------------------------------------------
 # CONFIGURAZIONE BASE
 # -------------------------------------------------------------------------
 app = Flask(__name__)
+
+# `python app.py`: il modulo gira come __main__; i moduli backend fanno `from app import db`
+# e senza alias ricaricherebbero app.py una seconda volta (import circolare).
+sys.modules.setdefault("app", sys.modules[__name__])
 app.secret_key = os.getenv("SECRET_KEY", "dev-key")
 
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -27,6 +32,14 @@ if not DATABASE_URL:
 app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URL
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
+# Login: costo hash, pool di verifica, cache e limiti (vedi backend/auth.py)
+app.config["PASSWORD_HASH_METHOD"] = os.getenv("PASSWORD_HASH_METHOD", "scrypt")
+app.config["LOGIN_HASH_WORKERS"] = int(os.getenv("LOGIN_HASH_WORKERS", "2"))
+app.config["LOGIN_HASH_QUEUE"] = int(os.getenv("LOGIN_HASH_QUEUE", "8"))
+app.config["LOGIN_CACHE_TTL"] = int(os.getenv("LOGIN_CACHE_TTL", "600"))
+app.config["LOGIN_RATE_PER_MIN"] = int(os.getenv("LOGIN_RATE_PER_MIN", "10"))
+app.config["LOGIN_BURST"] = int(os.getenv("LOGIN_BURST", "5"))
+
 db = SQLAlchemy(app)
 login_manager = LoginManager(app)
 login_manager.login_view = "login"
@@ -97,12 +110,34 @@ class OpeningHour(db.Model):
     windows = db.Column(db.Text)
 
 
+class WaitlistEntry(db.Model):
+    """Lista d'attesa (backend/waitlist.py, sql/2025-10-waitlist.sql)."""
+    __tablename__ = "waitlist"
+    __table_args__ = (
+        db.Index("idx_waitlist_rest_date_time", "restaurant_id", "date", "time"),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    restaurant_id = db.Column(db.Integer, db.ForeignKey("restaurant.id"), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    time = db.Column(db.Time, nullable=False)
+    name = db.Column(db.String(120), nullable=False)
+    phone = db.Column(db.String(40))
+    people = db.Column(db.Integer, nullable=False, default=2)
+    note = db.Column(db.Text)
+    status = db.Column(db.String(20), nullable=False, default="WAITING")  # WAITING / PROMOTED / REMOVED
+    reservation_id = db.Column(db.Integer, db.ForeignKey("reservation.id"))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    promoted_at = db.Column(db.DateTime)
+
+
 # -------------------------------------------------------------------------
 # BOOTSTRAP SCHEMA (Render non supporta before_first_request)
 # -------------------------------------------------------------------------
 def _ensure_schema():
     engine = db.get_engine()
     insp = inspect(engine)
+    if not insp.has_table("reservation"):
+        return  # DB nuovo/vuoto: niente da migrare
     cols = [c["name"] for c in insp.get_columns("reservation")]
     if "created_at" not in cols:
         try:
@@ -165,22 +200,39 @@ def login():
     username = (request.form.get("username") or "").strip()
     password = request.form.get("password") or ""
 
+    ip = client_ip()
+    try:
+        password_hasher.check_rate(ip)
+    except LoginThrottled as e:
+        flash(f"Troppi tentativi, riprova tra {int(e.retry_after) + 1} secondi", "error")
+        return redirect(url_for("login"))
+
     user = User.query.filter_by(username=username).first()
     if not user:
+        password_hasher.record_failure(ip)
         flash("Credenziali errate", "error")
         return redirect(url_for("login"))
 
     ok = False
 
-    if user.password_hash:
-        ok = check_password_hash(user.password_hash, password)
-    elif user.password == password:
-        ok = True
-        user.password_hash = generate_password_hash(password)
-        user.password = ""
-        db.session.commit()
+    try:
+        if user.password_hash:
+            ok = password_hasher.verify(user.password_hash, password)
+            if ok and password_hasher.needs_rehash(user.password_hash):
+                user.password_hash = password_hasher.hash(password)
+                db.session.commit()
+        elif user.password and hmac.compare_digest(user.password.encode(), password.encode()):
+            ok = True
+            user.password_hash = password_hasher.hash(password)
+            user.password = ""
+            db.session.commit()
+    except LoginBusy:
+        db.session.rollback()
+        flash("Troppi accessi in corso, riprova tra qualche secondo", "error")
+        return redirect(url_for("login"))
 
     if not ok:
+        password_hasher.record_failure(ip)
         flash("Credenziali errate", "error")
         return redirect(url_for("login"))
 
@@ -203,7 +255,38 @@ def logout():
 def dashboard():
     rest = Restaurant.query.get(current_user.restaurant_id)
     settings = Settings.query.filter_by(restaurant_id=current_user.restaurant_id).first()
-    return render_template("dashboard.html", restaurant=rest, settings=settings)
+    # Dati iniziali incorporati nella pagina: niente fetch al primo caricamento
+    bootstrap = build_bootstrap(current_user.restaurant_id)
+    return render_template("dashboard.html", restaurant=rest, settings=settings, bootstrap=bootstrap)
+
+
+# -------------------------------------------------------------------------
+# BLUEPRINTS (import dopo db/modelli per evitare import circolari)
+# -------------------------------------------------------------------------
+from backend import assets, compress  # noqa: E402
+from backend.analytics import bp_analytics  # noqa: E402
+from backend.auth import LoginBusy, LoginThrottled, client_ip, password_hasher  # noqa: E402
+from backend.bootstrap import bp_bootstrap, build_bootstrap  # noqa: E402
+from backend.fastjson import FastJSONProvider  # noqa: E402
+from backend.log_buffer import system_log_buffer  # noqa: E402
+from backend.reservations import bp_reservations  # noqa: E402
+from backend.tenancy import tenant_limiter  # noqa: E402
+from backend.voice_slots import bp_voice_slots  # noqa: E402
+from backend.voice_webhook import bp_voice_webhook  # noqa: E402
+from backend.waitlist import bp_waitlist  # noqa: E402
+
+app.json = FastJSONProvider(app)
+password_hasher.init_app(app)
+tenant_limiter.init_app(app)
+assets.init_app(app)
+compress.init_app(app)
+system_log_buffer.init_app(app)
+app.register_blueprint(bp_voice_slots)
+app.register_blueprint(bp_voice_webhook)
+app.register_blueprint(bp_bootstrap)
+app.register_blueprint(bp_analytics)
+app.register_blueprint(bp_waitlist)
+app.register_blueprint(bp_reservations)
 
 
 # -------------------------------------------------------------------------
@@ -2,7 +2,8 @@
 Backend package bootstrap.
 
 Nota: teniamo questo file volutamente leggero per evitare import circolari.
-I modelli sono in `backend.models`. Le utility/CLI sono in `backend.admin_sql`
+I modelli sono in `backend.models`. Le utility/CLI sono in `backend.admin_sql`,
+il worker della coda lavori in `backend.jobs`, i microbenchmark DB in `backend.bench_sql`
 e helper opzionali in `backend.monolith`.
 """
 
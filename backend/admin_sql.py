@@ -13,6 +13,7 @@ Tutte le operazioni sono idempotenti: possono essere rilanciate senza rompere da
 
 from __future__ import annotations
 import argparse
+import os
 from typing import Optional
 
 from sqlalchemy import text, inspect
@@ -42,6 +43,20 @@ def create_index_if_missing(index_name: str, table: str, expr: str) -> None:
         conn.execute(text(f'CREATE INDEX IF NOT EXISTS {index_name} ON "{table}" ({expr});'))
 
 
+def apply_sql_file(name: str) -> None:
+    """
+    Esegue un file di sql/ (solo istruzioni semplici separate da ";", senza funzioni $$).
+    Tabelle e indici di coda lavori e lista d'attesa restano definiti lì, in un solo posto.
+    """
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sql", name)
+    with open(path, encoding="utf-8") as f:
+        body = "".join(line for line in f if not line.lstrip().startswith("--"))
+    with db.engine.begin() as conn:
+        for stmt in body.split(";"):
+            if stmt.strip():
+                conn.execute(text(stmt))
+
+
 def ensure_schema() -> None:
     """
     Crea tabelle dai modelli e colonne chiave se mancanti.
@@ -58,6 +73,8 @@ def ensure_schema() -> None:
     # 3) Indici utili
     create_index_if_missing("idx_reservation_rest_date", "reservation", "restaurant_id, date, time")
     create_index_if_missing("idx_special_day_rest_date", "special_day", "restaurant_id, date")
+    apply_sql_file("2025-10-job-queue.sql")  # tabella job_queue + indici parziali (definiti solo lì)
+    apply_sql_file("2025-10-waitlist.sql")  # tabella waitlist + idx_waitlist_rest_date_time / _waiting
 
 
 # ------------------------------ SEED / DATI -------------------------------- #
@@ -84,7 +101,7 @@ def seed_restaurant_and_user(rest_name: str, username: str, password: str, logo_
     """
     Crea/aggiorna ristorante + utente admin con password_hash.
     """
-    from werkzeug.security import generate_password_hash
+    from backend.auth import hash_password
     from backend.models import Restaurant, User
 
     rest = Restaurant.query.filter_by(name=rest_name).first()
@@ -104,13 +121,13 @@ def seed_restaurant_and_user(rest_name: str, username: str, password: str, logo_
         user = User(
             username=username,
             restaurant_id=rest.id,
-            password_hash=generate_password_hash(password),
+            password_hash=hash_password(password),
         )
         db.session.add(user)
         db.session.commit()
         print(f"[OK] Creato User id={user.id} username={username} (rest_id={rest.id})")
     else:
-        user.password_hash = generate_password_hash(password)
+        user.password_hash = hash_password(password)
         user.restaurant_id = rest.id
         db.session.commit()
         print(f"[OK] Password aggiornata per {username} (rest_id={rest.id})")
@@ -125,7 +142,7 @@ def print_diagnostics() -> None:
     tables = insp.get_table_names()
     print("=== TABELLE PRESENTI ===")
     print(tables)
-    keys = ["user", "restaurant", "reservation", "opening_hours", "special_day", "settings", "menu_item", "active_calls"]
+    keys = ["user", "restaurant", "reservation", "opening_hours", "special_day", "settings", "menu_item", "active_calls", "job_queue", "waitlist"]
     for t in keys:
         if t in tables:
             cols = [c["name"] for c in insp.get_columns(t)]
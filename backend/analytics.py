@@ -0,0 +1,208 @@
+"""
+Analytics prenotazioni: occupazione per servizio, heatmap giorno/ora, previsione.
+
+GET /api/analytics?days=365
+
+Tutto lo storico (più le prossime 4 settimane già prenotate) arriva con UNA query
+come colonne (data, ora, persone, stato); i conteggi sono poi aggregazioni
+vettoriali NumPy (`bincount` su indici giorno/servizio/ora), senza cicli per riga.
+Un anno di un ristorante sono poche decine di migliaia di righe: millisecondi.
+
+Servizi: pranzo se l'ora è < `ANALYTICS_DINNER_FROM` (default 17), altrimenti cena.
+Prezzi da Settings.avg_price_lunch / avg_price_dinner, capienza da Settings.capacity_max.
+"""
+
+from __future__ import annotations
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, Optional
+
+import numpy as np
+from flask import Blueprint, current_app, jsonify, request
+from flask_login import current_user, login_required
+from sqlalchemy import text
+
+from backend.tenancy import tenant_limited
+
+bp_analytics = Blueprint("analytics", __name__, url_prefix="/api")
+
+CANCELLED = np.array(["CANCELLED", "CANCELLATA", "ANNULLATA"])
+FORECAST_DAYS = 28
+FORECAST_WEEKS = 8  # settimane di storico usate per ogni giorno della settimana
+DOW = ["Lun", "Mar", "Mer", "Gio", "Ven", "Sab", "Dom"]
+SERVICES = ("lunch", "dinner")
+
+
+def _dow(days: np.ndarray) -> np.ndarray:
+    """datetime64[D] -> 0 = Lunedì ... 6 = Domenica (1970-01-01 era giovedì)."""
+    return (days.astype(np.int64) + 3) % 7
+
+
+def load_columns(rest_id: int, since: date, until: date) -> Dict[str, np.ndarray]:
+    """Prenotazioni attive in [since, until] come array colonnari (una sola query)."""
+    from app import db
+
+    rows = db.session.execute(
+        text(
+            """
+            SELECT CAST(date AS TEXT), CAST(time AS TEXT), people, status
+              FROM reservation
+             WHERE restaurant_id = :rid AND date >= :since AND date <= :until
+            """
+        ),
+        {"rid": rest_id, "since": since.isoformat(), "until": until.isoformat()},
+    ).fetchall()
+
+    if not rows:
+        return {
+            "day": np.empty(0, dtype="datetime64[D]"),
+            "hour": np.empty(0, dtype=np.int64),
+            "people": np.empty(0, dtype=np.int64),
+        }
+
+    d, t, p, st = zip(*rows)
+    status = np.char.upper(np.array([s or "" for s in st], dtype="U16"))
+    keep = ~np.isin(status, CANCELLED)
+    return {
+        "day": np.array(d, dtype="datetime64[D]")[keep],
+        # "19:30" / "19:30:00" -> "19" troncando a 2 caratteri, poi intero
+        "hour": np.array(t, dtype="U2")[keep].astype(np.int64),
+        "people": np.array([x or 0 for x in p], dtype=np.int64)[keep],
+    }
+
+
+def compute_analytics(rest_id: int, days: int = 365, today: Optional[date] = None,
+                      dinner_from: int = 17) -> Dict[str, Any]:
+    from app import Settings
+
+    today = today or date.today()
+    since = today - timedelta(days=days - 1)
+    until = today + timedelta(days=FORECAST_DAYS)
+
+    s = Settings.query.filter_by(restaurant_id=rest_id).first()
+    price = {
+        "lunch": float((s.avg_price_lunch if s else None) or 0.0),
+        "dinner": float((s.avg_price_dinner if s else None) or 0.0),
+    }
+    capacity = float(s.capacity_max) if s and s.capacity_max else None
+
+    cols = load_columns(rest_id, since, until)
+    n_hist = days
+    n_all = (until - since).days + 1
+    start = np.datetime64(since.isoformat(), "D")
+
+    day_idx = (cols["day"] - start).astype(np.int64)
+    svc = (cols["hour"] >= dinner_from).astype(np.int64)  # 0 pranzo, 1 cena
+    people = cols["people"]
+    hist = day_idx < n_hist
+
+    # coperti per (giorno, servizio) su tutto l'intervallo, storico + futuro
+    covers = np.bincount(day_idx * 2 + svc, weights=people, minlength=n_all * 2).reshape(n_all, 2)
+    bookings = np.bincount(day_idx * 2 + svc, minlength=n_all * 2).reshape(n_all, 2)
+    h_covers, h_bookings = covers[:n_hist], bookings[:n_hist]
+
+    # ---------------- occupazione per servizio ----------------
+    occupancy: Dict[str, Any] = {}
+    for i, name in enumerate(SERVICES):
+        col = h_covers[:, i]
+        served = col > 0
+        entry: Dict[str, Any] = {
+            "services": int(served.sum()),
+            "bookings": int(h_bookings[:, i].sum()),
+            "covers": int(col.sum()),
+            "avg_covers": float(col[served].mean()) if served.any() else 0.0,
+            "peak_covers": int(col.max()) if col.size else 0,
+            "avg_price": price[name],
+            "estimated_revenue": float(col.sum()) * price[name],
+        }
+        if capacity:
+            occ = col[served] / capacity
+            entry["avg_occupancy"] = float(occ.mean()) if occ.size else 0.0
+            entry["p90_occupancy"] = float(np.percentile(occ, 90)) if occ.size else 0.0
+            entry["full_services"] = int((occ >= 1.0).sum())
+        occupancy[name] = entry
+
+    # ---------------- heatmap giorno settimana x ora ----------------
+    h_day = cols["day"][hist]
+    cell = _dow(h_day) * 24 + cols["hour"][hist].clip(0, 23)
+    heat_covers = np.bincount(cell, weights=people[hist], minlength=7 * 24).reshape(7, 24)
+    heat_bookings = np.bincount(cell, minlength=7 * 24).reshape(7, 24)
+
+    range_dow = _dow(start + np.arange(n_all))
+    hist_dow = range_dow[:n_hist]
+    n_per_dow = np.bincount(hist_dow, minlength=7)
+    daily = h_covers.sum(axis=1)
+    avg_by_dow = np.bincount(hist_dow, weights=daily, minlength=7) / np.maximum(n_per_dow, 1)
+
+    # ---------------- previsione 4 settimane ----------------
+    # Per ogni giorno della settimana: media pesata esponenziale delle ultime
+    # FORECAST_WEEKS occorrenze (la più recente pesa di più), per servizio.
+    weights = 0.5 ** (np.arange(FORECAST_WEEKS)[::-1] / 4.0)
+    level = np.zeros((7, 2))
+    for w in range(7):
+        same = h_covers[hist_dow == w][-FORECAST_WEEKS:]
+        if len(same):
+            ww = weights[-len(same):]
+            level[w] = (same * ww[:, None]).sum(axis=0) / ww.sum()
+
+    fut_dow = range_dow[n_hist:]
+    fut_level = level[fut_dow]
+    booked = covers[n_hist:]
+    fut_days = start + np.arange(n_hist, n_all)
+    forecast = [
+        {
+            "date": str(fut_days[i]),
+            "dow": DOW[fut_dow[i]],
+            "lunch": round(float(fut_level[i, 0]), 1),
+            "dinner": round(float(fut_level[i, 1]), 1),
+            "covers": round(float(fut_level[i].sum()), 1),
+            "booked": int(booked[i].sum()),
+        }
+        for i in range(len(fut_days))
+    ]
+
+    return {
+        "since": since.isoformat(),
+        "until": today.isoformat(),
+        "capacity": capacity,
+        "dinner_from": dinner_from,
+        "occupancy": occupancy,
+        "by_dow": [
+            {"dow": DOW[w], "days": int(n_per_dow[w]), "avg_covers": round(float(avg_by_dow[w]), 1)}
+            for w in range(7)
+        ],
+        "heatmap": {
+            "dow": DOW,
+            "hours": list(range(24)),
+            "covers": heat_covers.astype(np.int64).tolist(),
+            "bookings": heat_bookings.tolist(),
+        },
+        "forecast": forecast,
+    }
+
+
+@bp_analytics.get("/analytics")
+@login_required
+@tenant_limited("reservations", lambda: current_user.restaurant_id)
+def analytics():
+    """
+    Query string: ?days=365 (storico in giorni, max 3 anni)
+
+    Ritorna:
+    { "ok": true, "occupancy": {"lunch": {...}, "dinner": {...}}, "by_dow": [...],
+      "heatmap": {...}, "forecast": [...], "elapsed_ms": 4.2 }
+    """
+    try:
+        days = int(request.args.get("days") or 365)
+    except ValueError:
+        return jsonify(ok=False, error="days non valido"), 400
+    days = max(7, min(days, 3 * 365))
+
+    t0 = time.perf_counter()
+    data = compute_analytics(
+        current_user.restaurant_id,
+        days=days,
+        dinner_from=int(current_app.config.get("ANALYTICS_DINNER_FROM", 17)),
+    )
+    data["elapsed_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    return jsonify(ok=True, **data)
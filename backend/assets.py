@@ -0,0 +1,184 @@
+"""
+Pipeline asset statici: nomi con hash, varianti precompresse, cache lunga.
+
+BUILD: gira all'avvio del processo web (Procfile: `python -m backend.assets && gunicorn ...`),
+quindi ogni deploy serve gli asset del commit corrente; a mano:
+  python -m backend.assets
+
+Per ogni file in static/{js,css,img} scrive in static/dist/:
+  js/main.3f2a1b9c.js      copia con hash del contenuto nel nome
+  js/main.3f2a1b9c.js.gz   gzip -9
+  js/main.3f2a1b9c.js.br   brotli (solo se il pacchetto `brotli` è installato)
+e il manifest in static/assets-manifest.json:
+  { "js/main.js": "dist/js/main.3f2a1b9c.js", ... }
+Il manifest NON sta in dist/: il suo nome non ha hash, quindi non deve ricevere
+la cache `immutable` di un anno.
+
+A runtime `init_app(app)` legge il manifest e:
+  - riscrive `url_for('static', filename='js/main.js')` verso il file con hash
+    (nessuna modifica ai template);
+  - serve /static/dist/* scegliendo .br/.gz da Accept-Encoding, con
+    `Cache-Control: public, max-age=31536000, immutable`;
+  - se `whitenoise` è installato, gli asset vengono serviti dal middleware WSGI
+    prima di arrivare a Flask.
+
+Senza manifest (build non eseguita) tutto resta come prima.
+"""
+
+from __future__ import annotations
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+from typing import Dict, Optional
+
+from flask import request, send_from_directory, abort
+
+from backend.compress import choose_encoding
+
+try:  # opzionale
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:  # opzionale
+    from whitenoise import WhiteNoise  # type: ignore
+except ImportError:  # pragma: no cover
+    WhiteNoise = None
+
+SOURCE_DIRS = ("js", "css", "img")
+DIST_DIR = "dist"
+MANIFEST = "assets-manifest.json"  # in static/, fuori da dist/
+ONE_YEAR = 365 * 24 * 3600
+IMMUTABLE = f"public, max-age={ONE_YEAR}, immutable"
+
+STATIC_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+
+
+# ------------------------------- BUILD ------------------------------------- #
+
+def _hashed_name(rel: str, data: bytes) -> str:
+    digest = hashlib.sha256(data).hexdigest()[:8]
+    base, ext = os.path.splitext(rel)
+    return f"{base}.{digest}{ext}"
+
+
+def build(static_root: str = STATIC_ROOT) -> Dict[str, str]:
+    """Genera static/dist + manifest. Ritorna il manifest."""
+    dist_root = os.path.join(static_root, DIST_DIR)
+    if os.path.isdir(dist_root):
+        shutil.rmtree(dist_root)
+    manifest: Dict[str, str] = {}
+
+    for sub in SOURCE_DIRS:
+        src_dir = os.path.join(static_root, sub)
+        if not os.path.isdir(src_dir):
+            continue
+        for dirpath, _, files in os.walk(src_dir):
+            for fn in sorted(files):
+                src = os.path.join(dirpath, fn)
+                rel = os.path.relpath(src, static_root).replace(os.sep, "/")
+                with open(src, "rb") as f:
+                    data = f.read()
+
+                hashed = _hashed_name(rel, data)
+                dst = os.path.join(dist_root, hashed)
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                with open(dst, "wb") as f:
+                    f.write(data)
+                # mtime=0: output deterministico tra una build e l'altra
+                with open(dst + ".gz", "wb") as f:
+                    f.write(gzip.compress(data, compresslevel=9, mtime=0))
+                if brotli is not None:
+                    with open(dst + ".br", "wb") as f:
+                        f.write(brotli.compress(data, quality=11))
+
+                manifest[rel] = f"{DIST_DIR}/{hashed}"
+
+    os.makedirs(dist_root, exist_ok=True)
+    with open(os.path.join(static_root, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(static_root: str = STATIC_ROOT) -> Dict[str, str]:
+    path = os.path.join(static_root, MANIFEST)
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# ------------------------------ RUNTIME ------------------------------------ #
+
+def _pick_encoding(accept: str, path: str) -> Optional[str]:
+    """'br' / 'gzip' se accettato dal client e la variante esiste su disco."""
+    available = tuple(enc for enc, ext in (("br", ".br"), ("gzip", ".gz")) if os.path.isfile(path + ext))
+    return choose_encoding(accept, available)
+
+
+def init_app(app) -> None:
+    static_root = app.static_folder or STATIC_ROOT
+    manifest = load_manifest(static_root)
+    app.extensions["asset_manifest"] = manifest
+    if not manifest:
+        return
+
+    dist_root = os.path.join(static_root, DIST_DIR)
+    hashed = set(manifest.values())  # solo file con hash nel nome: cache immutable
+
+    @app.url_defaults
+    def _hashed_static(endpoint, values):
+        if endpoint == "static":
+            fn = values.get("filename")
+            if fn in manifest:
+                values["filename"] = manifest[fn]
+
+    def serve_dist(filename):
+        path = os.path.join(dist_root, filename)
+        if f"{DIST_DIR}/{filename}" not in hashed or not os.path.isfile(path):
+            abort(404)
+        enc = _pick_encoding(request.headers.get("Accept-Encoding", ""), path)
+        ext = {"br": ".br", "gzip": ".gz"}.get(enc, "")
+        mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        resp = send_from_directory(dist_root, filename + ext, mimetype=mimetype, max_age=ONE_YEAR)
+        if enc:
+            resp.headers["Content-Encoding"] = enc
+        resp.headers["Vary"] = "Accept-Encoding"
+        resp.headers["Cache-Control"] = IMMUTABLE
+        return resp
+
+    # Più specifica di /static/<path:filename>: vince nel routing
+    app.add_url_rule(f"{app.static_url_path}/{DIST_DIR}/<path:filename>", "static_dist", serve_dist)
+
+    if WhiteNoise is not None and app.config.get("ASSETS_WHITENOISE", True):
+        app.wsgi_app = WhiteNoise(
+            app.wsgi_app,
+            root=dist_root,
+            prefix=f"{app.static_url_path.strip('/')}/{DIST_DIR}/",
+            max_age=ONE_YEAR,
+            immutable_file_test=lambda path, url: True,
+        )
+
+
+# ------------------------------- CLI --------------------------------------- #
+
+def main():
+    parser = argparse.ArgumentParser(description="Build asset statici (hash + gzip/brotli)")
+    parser.add_argument("--static", type=str, default=STATIC_ROOT, help="Cartella static/")
+    args = parser.parse_args()
+
+    manifest = build(args.static)
+    for src, dst in sorted(manifest.items()):
+        print(f"[OK] {src} -> {dst}")
+    if brotli is None:
+        print("[WARN] pacchetto 'brotli' non installato: solo varianti .gz")
+    print(f"[DONE] {len(manifest)} asset generati.")
+
+
+if __name__ == "__main__":
+    main()
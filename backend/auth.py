@@ -0,0 +1,160 @@
+"""
+Verifica password per il login, senza far soffrire il resto dell'app.
+
+- Costo dell'hash configurabile (`PASSWORD_HASH_METHOD`, es. "scrypt",
+  "scrypt:16384:8:1", "pbkdf2:sha256:260000"). Se l'hash salvato usa parametri
+  diversi viene rigenerato al login successivo (rehash trasparente).
+- Hash/verifica girano in un pool di thread limitato (`LOGIN_HASH_WORKERS`),
+  con coda massima `LOGIN_HASH_QUEUE`: durante un picco di login al massimo N
+  calcoli KDF alla volta, il resto delle richieste (prenotazioni, voce) resta fluido.
+- Cache delle verifiche riuscite (HMAC con SECRET_KEY di hash+password, mai la
+  password in chiaro) per `LOGIN_CACHE_TTL` secondi: i login ripetuti dallo
+  stesso tablet non ripagano il KDF.
+- Rate limit per IP sui soli tentativi falliti (`LOGIN_RATE_PER_MIN`, `LOGIN_BURST`):
+  i tablet di un ristorante dietro lo stesso NAT che entrano correttamente non
+  consumano gettoni.
+
+Tutte le chiavi sopra si impostano da variabile d'ambiente, lette in app.py.
+"""
+
+from __future__ import annotations
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, Optional, TypeVar
+
+from flask import current_app, request
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from backend.ratelimit import KeyedTokenBuckets
+
+T = TypeVar("T")
+
+
+class LoginBusy(Exception):
+    """Pool di verifica saturo: troppi login contemporanei."""
+
+
+class LoginThrottled(Exception):
+    """Troppi tentativi dallo stesso IP."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"riprova tra {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+
+    def __init__(self):
+        self.method = "scrypt"
+        self.cache_ttl = 600
+        self.cache_size = 1024
+        self.timeout = 10.0
+        self._prefix: Optional[str] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[threading.BoundedSemaphore] = None
+        self._cache: "OrderedDict[bytes, float]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.limiter = KeyedTokenBuckets(rate=10 / 60, burst=5)
+
+    def init_app(self, app) -> None:
+        # valori letti dall'ambiente in app.py (sezione CONFIGURAZIONE BASE)
+        cfg = app.config
+
+        self.method = cfg["PASSWORD_HASH_METHOD"]
+        self.cache_ttl = int(cfg["LOGIN_CACHE_TTL"])
+        workers = max(int(cfg["LOGIN_HASH_WORKERS"]), 1)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pw-hash")
+        self._slots = threading.BoundedSemaphore(workers + max(int(cfg["LOGIN_HASH_QUEUE"]), 0))
+        self.limiter = KeyedTokenBuckets(rate=float(cfg["LOGIN_RATE_PER_MIN"]) / 60, burst=cfg["LOGIN_BURST"])
+        # "scrypt" -> "scrypt:32768:8:1": forma completa dei parametri, calcolata una volta
+        self._prefix = generate_password_hash("", self.method).split("$", 1)[0]
+        app.extensions["password_hasher"] = self
+
+    # ------------------------------------------------------------------ #
+
+    def _run(self, fn: Callable[..., T], *args) -> T:
+        if self._pool is None:  # fuori dall'app (CLI): calcolo diretto
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise LoginBusy()
+        try:
+            fut = self._pool.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # lo slot si libera quando il calcolo finisce davvero, non quando smettiamo di aspettarlo
+        fut.add_done_callback(lambda _f: self._slots.release())
+        try:
+            return fut.result(timeout=self.timeout)
+        except FutureTimeout:
+            fut.cancel()  # se è ancora in coda non parte più
+            raise LoginBusy() from None
+
+    def _cache_key(self, stored_hash: str, password: str) -> bytes:
+        secret = (current_app.secret_key or "").encode()
+        return hmac.new(secret, f"{stored_hash}\0{password}".encode(), hashlib.sha256).digest()
+
+    def _cache_hit(self, key: bytes) -> bool:
+        now = time.monotonic()
+        with self._cache_lock:
+            exp = self._cache.get(key)
+            if exp is None:
+                return False
+            if exp < now:
+                del self._cache[key]
+                return False
+            return True
+
+    def _cache_put(self, key: bytes) -> None:
+        with self._cache_lock:
+            self._cache[key] = time.monotonic() + self.cache_ttl
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    # ------------------------------------------------------------------ #
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, stored_hash: str, password: str) -> bool:
+        key = self._cache_key(stored_hash, password)
+        if self._cache_hit(key):
+            return True
+        ok = self._run(check_password_hash, stored_hash, password)
+        if ok:
+            self._cache_put(key)
+        return ok
+
+    def needs_rehash(self, stored_hash: str) -> bool:
+        """True se l'hash salvato non usa i parametri configurati."""
+        if self._prefix is None:
+            self._prefix = generate_password_hash("", self.method).split("$", 1)[0]
+        return (stored_hash or "").split("$", 1)[0] != self._prefix
+
+    def check_rate(self, ip: str) -> None:
+        """LoginThrottled se l'IP ha esaurito i tentativi falliti (non consuma gettoni)."""
+        wait = self.limiter.retry_after(ip)
+        if wait > 0:
+            raise LoginThrottled(wait)
+
+    def record_failure(self, ip: str) -> None:
+        """Un tentativo fallito consuma un gettone dell'IP."""
+        self.limiter.allow(ip)
+
+
+password_hasher = PasswordHasher()
+
+
+def client_ip() -> str:
+    """IP del client dietro il proxy di Render (aggiunge un solo hop in X-Forwarded-For)."""
+    route = request.access_route
+    return route[-1] if route else (request.remote_addr or "")
+
+
+def hash_password(password: str) -> str:
+    return password_hasher.hash(password)
@@ -0,0 +1,508 @@
+"""
+Microbenchmark DB per Prenotazioni-AI (solo PostgreSQL).
+
+Misura `acquire_slot()` / `release_slot()` (sql/2025-10-active-calls.sql) e le query
+servite dall'indice `idx_reservation_rest_date` con tabelle di dimensioni realistiche.
+
+USO (Render Shell o locale con DATABASE_URL):
+  # 1) dati sintetici deterministici (stesso --seed => stessi dati)
+  python -m backend.bench_sql --generate --seed 42 --tenants 50 --days 365 --per-day 40 --calls 2000
+
+  # 2) piani EXPLAIN ANALYZE + simulazione chiamate concorrenti, salvati con etichetta
+  python -m backend.bench_sql --run --label baseline --concurrency 8 --sim-calls 2000
+
+  # ...modifica schema/indici/funzioni, poi:
+  python -m backend.bench_sql --run --label nuovo-indice
+  python -m backend.bench_sql --compare baseline nuovo-indice
+
+  # 3) pulizia dati sintetici
+  python -m backend.bench_sql --drop --seed 42
+
+I ristoranti sintetici si chiamano "bench-<seed>-NNNN": i dati reali non vengono toccati.
+I risultati finiscono nella tabella `bench_result` (e in --out file.json se richiesto),
+insieme a una "schema_version" (hash di funzioni e indici) per confrontare versioni.
+"""
+
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import random
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import column, insert, table, text
+
+from app import db
+
+CHUNK = 5000  # righe per transazione; insert() Core le manda in pagine multi-row (insertmanyvalues)
+SLOTS = ["12:00", "12:30", "13:00", "13:30", "14:00", "19:00", "19:30", "20:00", "20:30", "21:00", "21:30", "22:00"]
+STATUSES = [("CONFIRMED", 70), ("PENDING", 20), ("CANCELLED", 10)]
+
+# insert() su queste tabelle "leggere": con psycopg2 SQLAlchemy raggruppa le righe in
+# INSERT ... VALUES (...), (...) invece di un executemany riga per riga come con text()
+RESERVATION = table(
+    "reservation",
+    column("restaurant_id"), column("date"), column("time"), column("name"), column("phone"),
+    column("people"), column("status"), column("note"), column("created_at"),
+)
+ACTIVE_CALLS = table("active_calls", column("restaurant_id"), column("call_sid"), column("created_at"), column("active"))
+
+BENCH_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS bench_result (
+  id SERIAL PRIMARY KEY,
+  label VARCHAR(80) NOT NULL,
+  schema_version VARCHAR(16) NOT NULL,
+  name VARCHAR(80) NOT NULL,
+  metrics TEXT NOT NULL,
+  run_id VARCHAR(32),
+  created_at TIMESTAMP DEFAULT NOW()
+)
+"""
+# tabelle create prima dell'introduzione di run_id
+BENCH_RUN_ID_SQL = "ALTER TABLE bench_result ADD COLUMN IF NOT EXISTS run_id VARCHAR(32)"
+
+
+def _prefix(seed: int) -> str:
+    return f"bench-{seed}-"
+
+
+def _pct(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    k = min(int(round(p / 100.0 * (len(s) - 1))), len(s) - 1)
+    return s[k]
+
+
+def _summary(ms: List[float]) -> Dict[str, float]:
+    return {
+        "n": len(ms),
+        "mean_ms": round(statistics.fmean(ms), 3) if ms else 0.0,
+        "p50_ms": round(_pct(ms, 50), 3),
+        "p95_ms": round(_pct(ms, 95), 3),
+        "p99_ms": round(_pct(ms, 99), 3),
+        "max_ms": round(max(ms), 3) if ms else 0.0,
+    }
+
+
+# ------------------------------ GENERATORE --------------------------------- #
+
+def generate(seed: int, tenants: int, days: int, per_day: int, calls: int,
+             base_date: date) -> Dict[str, int]:
+    """
+    Crea `tenants` ristoranti con `days` giorni di prenotazioni (in media `per_day`
+    al giorno, con stagionalità settimanale) e `calls` chiamate storiche ciascuno.
+    Deterministico: dipende solo dai parametri.
+    """
+    rng = random.Random(seed)
+    prefix = _prefix(seed)
+    statuses = [s for s, _ in STATUSES]
+    status_w = [w for _, w in STATUSES]
+    # venerdì/sabato più pieni, lunedì più vuoto
+    dow_factor = [0.6, 0.8, 0.9, 1.0, 1.3, 1.5, 1.1]
+
+    with db.engine.begin() as conn:
+        existing = conn.execute(
+            text("SELECT COUNT(*) FROM restaurant WHERE name LIKE :p"), {"p": prefix + "%"}
+        ).scalar()
+        if existing:
+            raise SystemExit(f"[ERR] dati bench con seed={seed} già presenti: usa --drop prima")
+
+        rest_ids: List[int] = []
+        for i in range(tenants):
+            rid = conn.execute(
+                text("INSERT INTO restaurant (name, logo_path) VALUES (:n, :l) RETURNING id"),
+                {"n": f"{prefix}{i:04d}", "l": "img/logo_robot.svg"},
+            ).scalar()
+            rest_ids.append(int(rid))
+
+    n_res = n_calls = 0
+    for rid in rest_ids:
+        # ogni ristorante ha una "taglia" diversa (distribuzione asimmetrica)
+        size = rng.paretovariate(2.0)
+        rows: List[Dict[str, Any]] = []
+        for d in range(days):
+            day = base_date - timedelta(days=d)
+            n = max(0, int(rng.gauss(per_day * size * dow_factor[day.weekday()], per_day * 0.2)))
+            for _ in range(n):
+                rows.append({
+                    "restaurant_id": rid,
+                    "date": day,
+                    "time": rng.choice(SLOTS),
+                    "name": f"Bench {rng.randrange(10 ** 6):06d}",
+                    "phone": f"+39{rng.randrange(10 ** 9, 10 ** 10)}",
+                    "people": min(max(int(rng.gauss(3, 1.5)), 1), 12),
+                    "status": rng.choices(statuses, status_w)[0],
+                    "note": "",
+                    "created_at": datetime.combine(day, datetime.min.time()) - timedelta(hours=rng.randrange(1, 24 * 14)),
+                })
+        for i in range(0, len(rows), CHUNK):
+            with db.engine.begin() as conn:
+                conn.execute(insert(RESERVATION), rows[i:i + CHUNK])
+        n_res += len(rows)
+
+        call_rows = [
+            {
+                "restaurant_id": rid,
+                "call_sid": f"{prefix}{rid}-{k:07d}",
+                "created_at": datetime.combine(base_date, datetime.min.time()) - timedelta(minutes=rng.randrange(days * 24 * 60)),
+                "active": False,
+            }
+            for k in range(calls)
+        ]
+        for i in range(0, len(call_rows), CHUNK):
+            with db.engine.begin() as conn:
+                conn.execute(insert(ACTIVE_CALLS), call_rows[i:i + CHUNK])
+        n_calls += len(call_rows)
+
+    with db.engine.begin() as conn:
+        conn.execute(text("ANALYZE reservation"))
+        conn.execute(text("ANALYZE active_calls"))
+
+    return {"tenants": len(rest_ids), "reservations": n_res, "calls": n_calls}
+
+
+def drop(seed: int) -> None:
+    prefix = _prefix(seed)
+    with db.engine.begin() as conn:
+        ids = "SELECT id FROM restaurant WHERE name LIKE :p"
+        conn.execute(text(f"DELETE FROM reservation WHERE restaurant_id IN ({ids})"), {"p": prefix + "%"})
+        conn.execute(text(f"DELETE FROM active_calls WHERE restaurant_id IN ({ids})"), {"p": prefix + "%"})
+        n = conn.execute(text("DELETE FROM restaurant WHERE name LIKE :p"), {"p": prefix + "%"}).rowcount
+    print(f"[OK] Rimossi {n} ristoranti bench (seed={seed}).")
+
+
+# ------------------------------ MISURE ------------------------------------- #
+
+def schema_version() -> str:
+    """Hash di definizioni funzioni + indici delle tabelle misurate."""
+    with db.engine.connect() as conn:
+        funcs = conn.execute(
+            text(
+                """
+                SELECT p.proname, pg_get_functiondef(p.oid)
+                  FROM pg_proc p JOIN pg_namespace n ON n.oid = p.pronamespace
+                 WHERE n.nspname = 'public' AND p.proname IN ('acquire_slot', 'release_slot')
+                 ORDER BY p.proname
+                """
+            )
+        ).fetchall()
+        idx = conn.execute(
+            text(
+                """
+                SELECT indexname, indexdef FROM pg_indexes
+                 WHERE tablename IN ('reservation', 'active_calls')
+                 ORDER BY indexname
+                """
+            )
+        ).fetchall()
+    blob = json.dumps([list(map(str, r)) for r in funcs + idx])
+    return hashlib.sha256(blob.encode()).hexdigest()[:16]
+
+
+def _bench_tenants(seed: int) -> List[int]:
+    with db.engine.connect() as conn:
+        rows = conn.execute(
+            text("SELECT id FROM restaurant WHERE name LIKE :p ORDER BY id"), {"p": _prefix(seed) + "%"}
+        ).fetchall()
+    return [int(r[0]) for r in rows]
+
+
+def _plan_nodes(node: Dict[str, Any]):
+    yield node
+    for child in node.get("Plans", []) or []:
+        yield from _plan_nodes(child)
+
+
+def explain(name: str, sql: str, params: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    """
+    EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) + `repeat` esecuzioni cronometrate.
+    Tutto in transazioni annullate: acquire/release non lasciano tracce.
+    """
+    with db.engine.connect() as conn:
+        tx = conn.begin()
+        plan = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params).scalar()
+        tx.rollback()
+
+        timings: List[float] = []
+        for _ in range(repeat):
+            tx = conn.begin()
+            t0 = time.perf_counter()
+            conn.execute(text(sql), params).fetchall()
+            timings.append((time.perf_counter() - t0) * 1000)
+            tx.rollback()
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    top = plan[0]
+    nodes = list(_plan_nodes(top["Plan"]))
+    return {
+        "sql": " ".join(sql.split()),
+        "planning_ms": top.get("Planning Time"),
+        "execution_ms": top.get("Execution Time"),
+        "node_types": sorted({n["Node Type"] for n in nodes}),
+        "indexes": sorted({n["Index Name"] for n in nodes if n.get("Index Name")}),
+        # i buffer del nodo radice includono già quelli dei figli
+        "shared_hit": top["Plan"].get("Shared Hit Blocks", 0),
+        "shared_read": top["Plan"].get("Shared Read Blocks", 0),
+        "timing": _summary(timings),
+        "plan": plan,
+    }
+
+
+def query_plans(tenants: List[int], seed: int, base_date: date, repeat: int) -> Dict[str, Dict[str, Any]]:
+    rng = random.Random(seed + 1)
+    rid = rng.choice(tenants)
+    day = (base_date - timedelta(days=rng.randrange(30))).isoformat()
+    since = (base_date - timedelta(days=90)).isoformat()
+    csid = f"{_prefix(seed)}plan-{rid}"
+    queries: List[Tuple[str, str, Dict[str, Any]]] = [
+        ("reservations_by_day",
+         "SELECT id, time, name, people, status FROM reservation "
+         "WHERE restaurant_id = :rid AND date = :day ORDER BY time",
+         {"rid": rid, "day": day}),
+        ("reservations_range",
+         "SELECT date, time, people, status FROM reservation "
+         "WHERE restaurant_id = :rid AND date >= :since AND date <= :until",
+         {"rid": rid, "since": since, "until": base_date.isoformat()}),
+        ("active_calls_count",
+         "SELECT COUNT(*) FROM active_calls WHERE restaurant_id = :rid AND active = TRUE",
+         {"rid": rid}),
+        ("acquire_slot",
+         "SELECT acquire_slot(:rid, :csid, :max)",
+         {"rid": rid, "csid": csid, "max": 3}),
+        ("release_slot",
+         "SELECT release_slot(:csid)",
+         {"csid": f"{_prefix(seed)}{rid}-0000000"}),
+    ]
+    out = {}
+    for name, sql, params in queries:
+        out[name] = explain(name, sql, params, repeat)
+        print(f"[OK] {name}: exec {out[name]['execution_ms']} ms, p50 {out[name]['timing']['p50_ms']} ms, "
+              f"indici {out[name]['indexes'] or '-'}")
+    return out
+
+
+def simulate_calls(tenants: List[int], seed: int, concurrency: int, n_calls: int,
+                   max_calls: int, hold_ms: int) -> Dict[str, Any]:
+    """
+    Chiamate concorrenti: acquire -> attesa `hold_ms` (±50%) -> release.
+    I ristoranti sono scelti con distribuzione asimmetrica (pochi molto caldi).
+    `over_limit` conta i momenti in cui un ristorante ha avuto più di `max_calls`
+    chiamate attive contemporaneamente (race tra COUNT e INSERT in acquire_slot).
+    """
+    rng = random.Random(seed + 2)
+    weights = [1.0 / (i + 1) for i in range(len(tenants))]
+    plan = [
+        (rng.choices(tenants, weights)[0], f"{_prefix(seed)}sim-{k:07d}", hold_ms * rng.uniform(0.5, 1.5))
+        for k in range(n_calls)
+    ]
+
+    lock = threading.Lock()
+    active: Dict[int, int] = {}
+    peak: Dict[int, int] = {}
+    acquire_ms: List[float] = []
+    release_ms: List[float] = []
+    counters = {"acquired": 0, "overload": 0, "over_limit": 0, "errors": 0}
+
+    def one(item):
+        rid, csid, hold = item
+        try:
+            t0 = time.perf_counter()
+            with db.engine.begin() as conn:
+                overload = conn.execute(
+                    text("SELECT acquire_slot(:rid, :csid, :max)"), {"rid": rid, "csid": csid, "max": max_calls}
+                ).scalar()
+            t1 = time.perf_counter()
+            with lock:
+                acquire_ms.append((t1 - t0) * 1000)
+                if overload:
+                    counters["overload"] += 1
+                    return
+                counters["acquired"] += 1
+                active[rid] = active.get(rid, 0) + 1
+                peak[rid] = max(peak.get(rid, 0), active[rid])
+                if active[rid] > max_calls:
+                    counters["over_limit"] += 1
+            time.sleep(hold / 1000.0)
+            with lock:
+                active[rid] -= 1
+            t2 = time.perf_counter()
+            with db.engine.begin() as conn:
+                conn.execute(text("SELECT release_slot(:csid)"), {"csid": csid})
+            with lock:
+                release_ms.append((time.perf_counter() - t2) * 1000)
+        except Exception:
+            with lock:
+                counters["errors"] += 1
+
+    from app import app
+
+    def run(item):
+        with app.app_context():
+            one(item)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(run, plan))
+    wall = time.perf_counter() - t0
+
+    # pulizia: le chiamate simulate non devono restare in active_calls
+    with db.engine.begin() as conn:
+        conn.execute(text("DELETE FROM active_calls WHERE call_sid LIKE :p"), {"p": f"{_prefix(seed)}sim-%"})
+
+    result = {
+        "concurrency": concurrency,
+        "calls": n_calls,
+        "max_calls": max_calls,
+        "hold_ms": hold_ms,
+        "wall_s": round(wall, 3),
+        "throughput_cps": round(n_calls / wall, 1) if wall else 0.0,
+        "acquire": _summary(acquire_ms),
+        "release": _summary(release_ms),
+        "peak_active_max": max(peak.values()) if peak else 0,
+        **counters,
+    }
+    print(f"[OK] simulazione: {result['throughput_cps']} chiamate/s, acquire p95 {result['acquire']['p95_ms']} ms, "
+          f"overload {result['overload']}, oltre limite {result['over_limit']}, errori {result['errors']}")
+    return result
+
+
+# ------------------------------ RISULTATI ---------------------------------- #
+
+def save_results(label: str, version: str, results: Dict[str, Dict[str, Any]]) -> str:
+    """Salva tutte le metriche di un'esecuzione con lo stesso run_id. Ritorna il run_id."""
+    run_id = uuid.uuid4().hex
+    now = datetime.utcnow()
+    with db.engine.begin() as conn:
+        conn.execute(text(BENCH_TABLE_SQL))
+        conn.execute(text(BENCH_RUN_ID_SQL))
+        conn.execute(
+            text(
+                "INSERT INTO bench_result (label, schema_version, name, metrics, run_id, created_at) "
+                "VALUES (:label, :v, :name, :metrics, :run_id, :now)"
+            ),
+            [
+                {"label": label, "v": version, "name": name, "metrics": json.dumps(m, default=str),
+                 "run_id": run_id, "now": now}
+                for name, m in results.items()
+            ],
+        )
+    return run_id
+
+
+def load_results(label: str) -> Tuple[Optional[str], Dict[str, Dict[str, Any]]]:
+    """Ultima esecuzione salvata con `label` (tutte le righe del suo run_id)."""
+    with db.engine.connect() as conn:
+        rows = conn.execute(
+            text(
+                """
+                SELECT schema_version, name, metrics FROM bench_result
+                 WHERE label = :label
+                   AND run_id = (SELECT run_id FROM bench_result WHERE label = :label
+                                  ORDER BY id DESC LIMIT 1)
+                """
+            ),
+            {"label": label},
+        ).fetchall()
+    if not rows:
+        return None, {}
+    return rows[0][0], {r[1]: json.loads(r[2]) for r in rows}
+
+
+def _headline(m: Dict[str, Any]) -> Dict[str, float]:
+    if "acquire" in m:  # simulazione
+        return {"acquire_p95_ms": m["acquire"]["p95_ms"], "throughput_cps": m["throughput_cps"],
+                "over_limit": m["over_limit"]}
+    return {"execution_ms": m.get("execution_ms") or 0.0, "p50_ms": m["timing"]["p50_ms"],
+            "p95_ms": m["timing"]["p95_ms"]}
+
+
+def compare(a: str, b: str) -> None:
+    va, ra = load_results(a)
+    vb, rb = load_results(b)
+    if not ra or not rb:
+        raise SystemExit(f"[ERR] risultati mancanti per '{a if not ra else b}'")
+    print(f"{a} (schema {va})  vs  {b} (schema {vb})")
+    for name in sorted(set(ra) | set(rb)):
+        if name not in ra or name not in rb:
+            print(f" - {name}: presente solo in {'A' if name in ra else 'B'}")
+            continue
+        ha, hb = _headline(ra[name]), _headline(rb[name])
+        parts = []
+        for k in ha:
+            x, y = float(ha[k]), float(hb[k])
+            delta = f"{(y - x) / x * 100:+.1f}%" if x else "n/a"
+            parts.append(f"{k} {x:g} -> {y:g} ({delta})")
+        idx_a, idx_b = ra[name].get("indexes"), rb[name].get("indexes")
+        if idx_a != idx_b:
+            parts.append(f"indici {idx_a} -> {idx_b}")
+        print(f" - {name}: " + "; ".join(parts))
+
+
+# ------------------------------- CLI --------------------------------------- #
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark DB per Prenotazioni-AI")
+    parser.add_argument("--generate", action="store_true", help="Genera dati sintetici")
+    parser.add_argument("--run", action="store_true", help="Esegue EXPLAIN ANALYZE + simulazione")
+    parser.add_argument("--compare", nargs=2, metavar=("LABEL_A", "LABEL_B"), help="Confronta due esecuzioni")
+    parser.add_argument("--drop", action="store_true", help="Rimuove i dati sintetici del seed")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--tenants", type=int, default=20)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--per-day", type=int, default=40)
+    parser.add_argument("--calls", type=int, default=1000, help="Chiamate storiche per ristorante")
+    parser.add_argument("--base-date", type=str, default="2025-10-01", help="Ultimo giorno generato (YYYY-MM-DD)")
+    parser.add_argument("--label", type=str, default=None, help="Etichetta per salvare i risultati")
+    parser.add_argument("--repeat", type=int, default=50, help="Esecuzioni cronometrate per query")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--sim-calls", type=int, default=1000)
+    parser.add_argument("--max", type=int, default=3, help="Limite chiamate per ristorante nella simulazione")
+    parser.add_argument("--hold-ms", type=int, default=20)
+    parser.add_argument("--out", type=str, default=None, help="Salva anche su file JSON")
+    args = parser.parse_args()
+
+    from app import app
+
+    base_date = date.fromisoformat(args.base_date)
+    with app.app_context():
+        if args.drop:
+            drop(args.seed)
+
+        if args.generate:
+            t0 = time.perf_counter()
+            info = generate(args.seed, args.tenants, args.days, args.per_day, args.calls, base_date)
+            print(f"[OK] Generati {info} in {time.perf_counter() - t0:.1f}s")
+
+        if args.run:
+            tenants = _bench_tenants(args.seed)
+            if not tenants:
+                raise SystemExit(f"[ERR] nessun dato bench per seed={args.seed}: esegui prima --generate")
+            version = schema_version()
+            print(f"[OK] schema_version={version}, {len(tenants)} ristoranti")
+            results = query_plans(tenants, args.seed, base_date, args.repeat)
+            results["call_simulation"] = simulate_calls(
+                tenants, args.seed, args.concurrency, args.sim_calls, args.max, args.hold_ms
+            )
+            label = args.label or f"{datetime.utcnow():%Y%m%d-%H%M%S}"
+            save_results(label, version, results)
+            print(f"[OK] Risultati salvati con label '{label}'")
+            if args.out:
+                with open(args.out, "w", encoding="utf-8") as f:
+                    json.dump({"label": label, "schema_version": version, "results": results}, f, indent=2, default=str)
+
+        if args.compare:
+            compare(*args.compare)
+
+        print("[DONE]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Dati iniziali della dashboard in un colpo solo.
+
+`build_bootstrap()` raccoglie prenotazioni del giorno, orari, giorni speciali e
+statistiche con 5 query in tutto (una per tabella più un aggregato sulle
+prenotazioni), usando i modelli di app.py. Il risultato viene:
+  - incorporato come JSON in dashboard.html da `dashboard()` (zero fetch al primo paint)
+  - esposto su GET /api/bootstrap per i refresh lato client.
+
+Menu e form impostazioni non sono inclusi: main.js, se una chiave manca, ripiega
+sul proprio endpoint (/api/menu, /api/settings).
+"""
+
+from __future__ import annotations
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+from flask import Blueprint, current_app, request, jsonify
+from flask_login import login_required, current_user
+from sqlalchemy import func, case
+
+from backend.tenancy import tenant_limited
+
+bp_bootstrap = Blueprint("bootstrap", __name__, url_prefix="/api")
+
+
+def _parse_day(day: Optional[str]) -> date:
+    """"YYYY-MM-DD" -> date (default oggi). ValueError se il formato non è valido."""
+    if not day:
+        return date.today()
+    return datetime.strptime(day, "%Y-%m-%d").date()
+
+
+def build_bootstrap(rest_id: int, day: Optional[str] = None) -> Dict[str, Any]:
+    """Tutto ciò che serve alla dashboard per il giorno `day` ("YYYY-MM-DD", default oggi)."""
+    from app import db, OpeningHour, Reservation, Settings, SpecialDay
+
+    d = _parse_day(day)
+    dinner_from = int(current_app.config.get("ANALYTICS_DINNER_FROM", 17))
+
+    # 1) prenotazioni del giorno
+    rows = (Reservation.query.filter_by(restaurant_id=rest_id, date=d)
+            .order_by(Reservation.time.asc()).all())
+    reservations = [
+        {
+            "id": r.id,
+            "date": r.date.isoformat(),
+            "time": r.time.strftime("%H:%M"),
+            "name": r.name,
+            "phone": r.phone,
+            "people": r.people,
+            "status": r.status,
+            "note": r.note,
+        }
+        for r in rows
+    ]
+
+    # 2) aggregato unico: totali storici + conteggio del giorno
+    total, total_people, avg_people, day_count = db.session.query(
+        func.count(Reservation.id),
+        func.coalesce(func.sum(Reservation.people), 0),
+        func.coalesce(func.avg(Reservation.people), 0.0),
+        func.coalesce(func.sum(case((Reservation.date == d, 1), else_=0)), 0),
+    ).filter(Reservation.restaurant_id == rest_id).one()
+
+    # 3) orari settimanali -> { "0": "12:00-15:00, ...", ..., "6": "" }
+    hours = {str(w): "" for w in range(7)}
+    for row in OpeningHour.query.filter_by(restaurant_id=rest_id).all():
+        hours[str(row.weekday)] = row.windows or ""
+
+    # 4) giorni speciali
+    special_days = [
+        {"date": s.date.isoformat(), "closed": bool(s.closed), "windows": s.windows or ""}
+        for s in SpecialDay.query.filter_by(restaurant_id=rest_id).order_by(SpecialDay.date.asc()).all()
+    ]
+
+    # 5) prezzi medi per servizio (come backend/analytics.py): incasso = coperti x prezzo
+    s = Settings.query.filter_by(restaurant_id=rest_id).first()
+    price_lunch = float((s.avg_price_lunch if s else None) or 0.0)
+    price_dinner = float((s.avg_price_dinner if s else None) or 0.0)
+    revenue = sum(
+        r.people * (price_dinner if r.time.hour >= dinner_from else price_lunch)
+        for r in rows
+        if (r.status or "").upper() not in ("CANCELLED", "CANCELLATA", "ANNULLATA")
+    )
+
+    stats = {
+        "today_count": int(day_count),
+        "total_count": int(total),
+        "total_people": int(total_people),
+        "avg_people": float(avg_people),
+        "avg_price_lunch": price_lunch,
+        "avg_price_dinner": price_dinner,
+        "estimated_revenue": float(revenue),
+    }
+
+    return {
+        "day": d.isoformat(),
+        "reservations": reservations,
+        "hours": hours,
+        "special_days": special_days,
+        "stats": stats,
+    }
+
+
+@bp_bootstrap.get("/bootstrap")
+@login_required
+@tenant_limited("reservations", lambda: current_user.restaurant_id)
+def bootstrap():
+    """
+    Query string: ?date=YYYY-MM-DD (opzionale, default oggi)
+
+    Ritorna:
+    { "ok": true, "day": "...", "reservations": [...], "hours": {...},
+      "special_days": [...], "stats": {...} }
+    """
+    day = (request.args.get("date") or "").strip() or None
+    try:
+        data = build_bootstrap(current_user.restaurant_id, day)
+    except ValueError:
+        return jsonify(ok=False, error="data non valida"), 400
+    return jsonify(ok=True, **data)
@@ -0,0 +1,101 @@
+"""
+Compressione risposte (gzip / brotli) negoziata con Accept-Encoding.
+
+  compress.init_app(app)
+
+Si applica solo a risposte testuali (JSON, HTML, CSS, JS) sopra soglia
+`COMPRESS_MIN_SIZE` byte; file serviti con send_file, stream e risposte già
+codificate (es. static/dist/*.br) restano intatti.
+
+Config:
+  COMPRESS_MIN_SIZE   (default 1024)
+  COMPRESS_LEVEL      livello gzip (default 6)
+  COMPRESS_BR_LEVEL   qualità brotli (default 4: buon compromesso CPU/peso)
+"""
+
+from __future__ import annotations
+import gzip
+from typing import Dict, Optional, Tuple
+
+from flask import request
+
+try:  # opzionale
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover
+    brotli = None
+
+COMPRESSIBLE = {
+    "application/json",
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/javascript",
+    "application/javascript",
+    "image/svg+xml",
+}
+
+
+def accepted_encodings(header: str) -> Dict[str, float]:
+    """'gzip, br;q=0.9, *;q=0' -> {'gzip': 1.0, 'br': 0.9, '*': 0.0}"""
+    out: Dict[str, float] = {}
+    for part in (header or "").lower().split(","):
+        token, _, params = part.strip().partition(";")
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        out[token] = q
+    return out
+
+
+def choose_encoding(header: str, available: Tuple[str, ...] = ("br", "gzip")) -> Optional[str]:
+    """Miglior codifica tra `available` accettata dal client (a parità di q vince l'ordine)."""
+    acc = accepted_encodings(header)
+    best, best_q = None, 0.0
+    for enc in available:
+        q = acc.get(enc, acc.get("*", 0.0))
+        if q > best_q:
+            best, best_q = enc, q
+    return best
+
+
+def init_app(app) -> None:
+    app.config.setdefault("COMPRESS_MIN_SIZE", 1024)
+    app.config.setdefault("COMPRESS_LEVEL", 6)
+    app.config.setdefault("COMPRESS_BR_LEVEL", 4)
+    available = ("br", "gzip") if brotli is not None else ("gzip",)
+
+    @app.after_request
+    def _compress(resp):
+        if (
+            request.method == "HEAD"
+            or resp.status_code < 200
+            or resp.status_code in (204, 304)
+            or resp.direct_passthrough
+            or resp.is_streamed
+            or "Content-Encoding" in resp.headers
+            or resp.mimetype not in COMPRESSIBLE
+        ):
+            return resp
+
+        resp.vary.add("Accept-Encoding")
+        enc = choose_encoding(request.headers.get("Accept-Encoding", ""), available)
+        if enc is None:
+            return resp
+
+        data = resp.get_data()
+        if len(data) < app.config["COMPRESS_MIN_SIZE"]:
+            return resp
+
+        if enc == "br":
+            body = brotli.compress(data, quality=app.config["COMPRESS_BR_LEVEL"])
+        else:
+            body = gzip.compress(data, compresslevel=app.config["COMPRESS_LEVEL"])
+        resp.set_data(body)
+        resp.headers["Content-Encoding"] = enc
+        return resp
@@ -0,0 +1,57 @@
+"""
+JSON provider veloce per Flask: usa orjson se installato, altrimenti lo stdlib.
+
+  app.json = FastJSONProvider(app)
+
+Tutti i `jsonify(...)` (app.py, backend/voice_slots.py, ...) passano di qui senza
+modifiche. Differenza rispetto al provider di default: date/datetime escono in
+ISO 8601 ("2025-10-01", "2025-10-01T20:00:00") invece che in formato HTTP date.
+Per tutto ciò che orjson non sa serializzare (Decimal, UUID, dataclass, ...) si
+ripiega su `DefaultJSONProvider.default`.
+"""
+
+from __future__ import annotations
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+
+try:  # opzionale
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+
+    def _options(self) -> int:
+        opt = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            opt |= orjson.OPT_SORT_KEYS
+        return opt
+
+    def _dump_bytes(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=self.default, option=self._options())
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        try:
+            return self._dump_bytes(obj).decode("utf-8")
+        except TypeError:  # es. interi oltre 64 bit
+            return super().dumps(obj)
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        # In debug (o compact=False) teniamo l'output indentato dello stdlib
+        if orjson is None or self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        try:
+            body = self._dump_bytes(obj)
+        except TypeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
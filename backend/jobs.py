@@ -0,0 +1,319 @@
+"""
+Coda lavori asincroni su DB (tabella `job_queue`, vedi sql/2025-10-job-queue.sql).
+
+I webhook fanno solo `enqueue(...)` (una INSERT, pochi ms) e rispondono subito;
+il lavoro pesante (trascrizioni, notifiche, log) gira nel processo worker:
+
+  python -m backend.jobs            # loop continuo (Procfile -> worker)
+  python -m backend.jobs --once     # un solo batch, utile da Shell
+
+Il worker prende i lavori con `FOR UPDATE SKIP LOCKED`, quindi più worker
+possono girare in parallelo senza pestarsi i piedi. In caso di errore il lavoro
+viene ripianificato con backoff esponenziale fino a `max_attempts`.
+
+Mentre un batch gira, un heartbeat aggiorna `locked_at` ogni `HEARTBEAT_SECONDS`:
+solo i lavori senza heartbeat da `STALE_LOCK_SECONDS` (worker morto) vengono
+rimessi in coda da `recover_stale()`, che gira a parte ogni `RECOVER_EVERY_SECONDS`.
+Così la query dei lavori pronti resta `status = 'queued'` e usa l'indice parziale.
+
+Gli handler non scrivono direttamente su `system_log`: ritornano le righe di log
+e il worker le inserisce tutte insieme (multi-row) a fine batch.
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import random
+import signal
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import bindparam, text
+
+from backend.log_buffer import LogRow, insert_system_logs, system_log_buffer
+
+Handler = Callable[[Dict[str, Any]], Optional[Iterable[LogRow]]]
+
+HANDLERS: Dict[str, Handler] = {}
+
+BACKOFF_BASE_SECONDS = 5
+BACKOFF_MAX_SECONDS = 15 * 60
+STALE_LOCK_SECONDS = 10 * 60
+HEARTBEAT_SECONDS = 60
+RECOVER_EVERY_SECONDS = 60
+
+
+def handler(kind: str):
+    """Registra un handler per un tipo di lavoro: @handler("call.recording")."""
+    def deco(fn: Handler) -> Handler:
+        HANDLERS[kind] = fn
+        return fn
+    return deco
+
+
+# ------------------------------ PRODUCER ----------------------------------- #
+
+def enqueue(kind: str, payload: Dict[str, Any], delay_seconds: int = 0,
+            max_attempts: int = 5, commit: bool = True) -> int:
+    """
+    Accoda un lavoro e ritorna l'ID.
+    Con commit=False il lavoro entra nella transazione corrente del chiamante.
+    """
+    from app import db
+
+    run_at = datetime.utcnow() + timedelta(seconds=delay_seconds)
+    job_id = db.session.execute(
+        text(
+            """
+            INSERT INTO job_queue (kind, payload, status, attempts, max_attempts, run_at, created_at)
+            VALUES (:kind, :payload, 'queued', 0, :max_attempts, :run_at, :now)
+            RETURNING id
+            """
+        ),
+        {
+            "kind": kind,
+            "payload": json.dumps(payload, default=str),
+            "max_attempts": max_attempts,
+            "run_at": run_at,
+            "now": datetime.utcnow(),
+        },
+    ).scalar()
+    if commit:
+        db.session.commit()
+    return int(job_id)
+
+
+# ------------------------------ CONSUMER ----------------------------------- #
+
+def _backoff_seconds(attempts: int) -> float:
+    """5s, 10s, 20s, ... con tetto a 15 minuti e un po' di jitter."""
+    delay = min(BACKOFF_BASE_SECONDS * (2 ** max(attempts - 1, 0)), BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def claim_batch(conn, limit: int) -> List[Dict[str, Any]]:
+    """
+    Prende fino a `limit` lavori pronti e li marca come 'running'
+    (range scan su idx_job_queue_ready). I lavori già presi da altri worker vengono saltati.
+    """
+    now = datetime.utcnow()
+    rows = conn.execute(
+        text(
+            """
+            UPDATE job_queue
+               SET status = 'running', locked_at = :now, attempts = attempts + 1
+             WHERE id IN (
+                   SELECT id FROM job_queue
+                    WHERE status = 'queued' AND run_at <= :now
+                    ORDER BY run_at, id
+                    LIMIT :limit
+                    FOR UPDATE SKIP LOCKED
+             )
+            RETURNING id, kind, payload, attempts, max_attempts
+            """
+        ),
+        {"now": now, "limit": limit},
+    ).mappings().all()
+    return [dict(r) for r in rows]
+
+
+def recover_stale(conn) -> int:
+    """
+    Rimette in coda i lavori 'running' senza heartbeat da STALE_LOCK_SECONDS
+    (worker morto a metà batch); quelli che hanno finito i tentativi diventano 'failed'.
+    Usa idx_job_queue_running. Ritorna quanti lavori sono stati recuperati.
+    """
+    now = datetime.utcnow()
+    return conn.execute(
+        text(
+            """
+            UPDATE job_queue
+               SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+                   locked_at = NULL, run_at = :now,
+                   last_error = COALESCE(last_error, 'lock scaduto: worker interrotto')
+             WHERE status = 'running' AND locked_at < :stale
+            """
+        ),
+        {"now": now, "stale": now - timedelta(seconds=STALE_LOCK_SECONDS)},
+    ).rowcount
+
+
+class _Heartbeat:
+    """Thread che rinnova `locked_at` dei lavori presi finché il batch è in corso."""
+
+    def __init__(self, engine, ids: List[int], every: float = HEARTBEAT_SECONDS):
+        self.engine = engine
+        self.ids = ids
+        self.every = every
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="job-heartbeat", daemon=True)
+
+    def _loop(self) -> None:
+        stmt = text(
+            "UPDATE job_queue SET locked_at = :now WHERE status = 'running' AND id IN :ids"
+        ).bindparams(bindparam("ids", expanding=True))
+        while not self._stop.wait(self.every):
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(stmt, {"now": datetime.utcnow(), "ids": self.ids})
+            except Exception as e:
+                print("[WARN] heartbeat lavori fallito:", e)
+
+    def __enter__(self) -> "_Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def run_once(batch_size: int = 20) -> int:
+    """Esegue un batch di lavori. Ritorna quanti lavori sono stati presi."""
+    from app import db
+
+    with db.engine.begin() as conn:
+        jobs = claim_batch(conn, batch_size)
+    if not jobs:
+        return 0
+
+    done: List[int] = []
+    failed: List[Dict[str, Any]] = []
+    logs: List[LogRow] = []
+
+    with _Heartbeat(db.engine, [job["id"] for job in jobs]):
+        for job in jobs:
+            fn = HANDLERS.get(job["kind"])
+            try:
+                if fn is None:
+                    raise LookupError(f"nessun handler per '{job['kind']}'")
+                out = fn(json.loads(job["payload"] or "{}"))
+                if out:
+                    logs.extend(out)
+                done.append(job["id"])
+            except Exception as e:
+                job["error"] = f"{type(e).__name__}: {e}"
+                failed.append(job)
+
+    now = datetime.utcnow()
+    with db.engine.begin() as conn:
+        if done:
+            conn.execute(
+                text("UPDATE job_queue SET status = 'done', locked_at = NULL, last_error = NULL WHERE id = :id"),
+                [{"id": i} for i in done],
+            )
+        for job in failed:
+            final = job["attempts"] >= job["max_attempts"]
+            conn.execute(
+                text(
+                    """
+                    UPDATE job_queue
+                       SET status = :status, locked_at = NULL, last_error = :err, run_at = :run_at
+                     WHERE id = :id
+                    """
+                ),
+                {
+                    "id": job["id"],
+                    "status": "failed" if final else "queued",
+                    "err": job["error"][:2000],
+                    "run_at": now + timedelta(seconds=_backoff_seconds(job["attempts"])),
+                },
+            )
+            if final:
+                logs.append(("job.failed", json.dumps({"job_id": job["id"], "kind": job["kind"], "error": job["error"]})))
+        insert_system_logs(conn, logs)
+
+    return len(jobs)
+
+
+# ------------------------------ HANDLERS ----------------------------------- #
+
+@handler("call.recording")
+def _handle_call_recording(p: Dict[str, Any]) -> List[LogRow]:
+    """Webhook registrazione/trascrizione chiamata (vedi tests/req.json)."""
+    rows: List[LogRow] = [(
+        "call.recording",
+        json.dumps({
+            "call_sid": p.get("call_sid"),
+            "from": p.get("from"),
+            "to": p.get("to"),
+            "recording_sid": p.get("recording_sid"),
+            "recording_url": p.get("recording_url"),
+            "duration_seconds": p.get("duration_seconds"),
+            "received_at": p.get("received_at"),
+        }, ensure_ascii=False),
+    )]
+    transcript = (p.get("transcript") or "").strip()
+    if transcript:
+        rows.append((
+            "call.transcript",
+            json.dumps({"call_sid": p.get("call_sid"), "transcript": transcript}, ensure_ascii=False),
+        ))
+    return rows
+
+
+@handler("system_log")
+def _handle_system_log(p: Dict[str, Any]) -> List[LogRow]:
+    """Log generico differito: {"event": "...", "detail": "..."}."""
+    detail = p.get("detail")
+    if not isinstance(detail, str):
+        detail = json.dumps(detail, ensure_ascii=False, default=str)
+    return [(str(p.get("event") or "event")[:120], detail)]
+
+
+@handler("waitlist.promoted")
+def _handle_waitlist_promoted(p: Dict[str, Any]) -> List[LogRow]:
+    """Cliente promosso dalla lista d'attesa (backend.waitlist): traccia per lo staff."""
+    return [("waitlist.promoted", json.dumps(p, ensure_ascii=False, default=str))]
+
+
+# ------------------------------- CLI --------------------------------------- #
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker coda lavori Prenotazioni-AI")
+    parser.add_argument("--once", action="store_true", help="Esegue un solo batch ed esce")
+    parser.add_argument("--batch", type=int, default=20, help="Lavori presi per batch")
+    parser.add_argument("--poll", type=float, default=1.0, help="Attesa (s) quando la coda è vuota")
+    args = parser.parse_args()
+
+    from app import app, db
+
+    stop = {"flag": False}
+
+    def _stop(signum, frame):
+        stop["flag"] = True
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    with app.app_context():
+        if args.once:
+            with db.engine.begin() as conn:
+                recovered = recover_stale(conn)
+            n = run_once(args.batch)
+            print(f"[DONE] {n} lavori processati ({recovered} recuperati).")
+            return
+        print("[OK] Worker avviato.")
+        last_recover = 0.0
+        while not stop["flag"]:
+            try:
+                if time.monotonic() - last_recover >= RECOVER_EVERY_SECONDS:
+                    with db.engine.begin() as conn:
+                        recovered = recover_stale(conn)
+                    last_recover = time.monotonic()
+                    if recovered:
+                        print(f"[WARN] {recovered} lavori bloccati rimessi in coda")
+                n = run_once(args.batch)
+            except Exception as e:
+                print("[WARN] batch fallito:", e)
+                n = 0
+            if n < args.batch:
+                time.sleep(args.poll)
+        system_log_buffer.close()
+        print("[DONE] Worker fermato.")
+
+
+if __name__ == "__main__":
+    main()
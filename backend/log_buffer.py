@@ -0,0 +1,173 @@
+"""
+Buffer in memoria per `system_log`: niente INSERT nella transazione della richiesta.
+
+  from backend.log_buffer import log_event
+  log_event("call.acquire", {"restaurant_id": 1, "call_sid": "CA_xxx"})
+
+`log_event` mette l'evento in un buffer limitato (per processo) e ritorna subito.
+Un thread di background svuota il buffer con una INSERT multi-row ogni
+`flush_every` eventi o `flush_ms` millisecondi, e un'ultima volta allo shutdown
+del processo (atexit / SIGTERM del worker).
+
+Se il buffer è pieno l'evento viene scartato e contato in `dropped`: il log
+non deve mai rallentare prenotazioni e chiamate.
+"""
+
+from __future__ import annotations
+import atexit
+import json
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Tuple
+
+from sqlalchemy import column, insert, table
+
+# (event, detail) oppure (event, detail, created_at)
+LogRow = Tuple[Any, ...]
+
+# Tabella "leggera": il modello SystemLog sta in backend.models, non importabile insieme ad app.py
+SYSTEM_LOG = table("system_log", column("event"), column("detail"), column("created_at"))
+INSERT_CHUNK = 500  # righe per singola INSERT ... VALUES (...), (...), ...
+
+
+def insert_system_logs(conn, rows: List[LogRow]) -> None:
+    """
+    Inserimento multi-row in system_log: una sola INSERT con VALUES multipli
+    ogni `INSERT_CHUNK` righe (non un executemany riga per riga).
+    """
+    if not rows:
+        return
+    now = datetime.utcnow()
+    values = [{"event": r[0], "detail": r[1], "created_at": r[2] if len(r) > 2 else now} for r in rows]
+    for i in range(0, len(values), INSERT_CHUNK):
+        conn.execute(insert(SYSTEM_LOG).values(values[i:i + INSERT_CHUNK]))
+
+
+class SystemLogBuffer:
+    """Ring buffer limitato + flush a lotti su system_log."""
+
+    def __init__(self, capacity: int = 5000, flush_every: int = 200, flush_ms: int = 1000):
+        self.capacity = capacity
+        self.flush_every = flush_every
+        self.flush_ms = flush_ms
+        self._buf: Deque[Tuple[str, str, datetime]] = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._app = None
+        # contatori (vedi stats())
+        self.enqueued = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.backpressure = 0
+        self.flush_errors = 0
+
+    # ------------------------------------------------------------------ #
+
+    def init_app(self, app) -> None:
+        self._app = app
+        cfg = app.config
+        self.capacity = int(cfg.get("SYSTEM_LOG_BUFFER_SIZE", self.capacity))
+        self.flush_every = int(cfg.get("SYSTEM_LOG_FLUSH_EVERY", self.flush_every))
+        self.flush_ms = int(cfg.get("SYSTEM_LOG_FLUSH_MS", self.flush_ms))
+        atexit.register(self.close)
+
+    def _ensure_thread(self) -> None:
+        # Thread avviato al primo evento: dopo il fork di gunicorn, non prima.
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="system-log-flush", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_ms / 1000.0)
+            self._wake.clear()
+            self.flush()
+
+    # ------------------------------------------------------------------ #
+
+    def log(self, event: str, detail: Any = None) -> bool:
+        """Accoda un evento. Ritorna False se scartato (buffer pieno)."""
+        if not isinstance(detail, str):
+            detail = json.dumps(detail, ensure_ascii=False, default=str) if detail is not None else None
+        row = (str(event)[:120], detail, datetime.utcnow())
+        with self._lock:
+            n = len(self._buf)
+            if n >= self.capacity:
+                self.dropped += 1
+                return False
+            self._buf.append(row)
+            self.enqueued += 1
+            n += 1
+        if n >= self.flush_every:
+            if n >= self.capacity // 2:
+                self.backpressure += 1
+            self._wake.set()
+        self._ensure_thread()
+        return True
+
+    def _drain(self, limit: int) -> List[Tuple[str, str, datetime]]:
+        with self._lock:
+            k = min(limit, len(self._buf))
+            return [self._buf.popleft() for _ in range(k)]
+
+    def flush(self) -> int:
+        """Scrive tutto il buffer su DB a lotti di `flush_every`. Ritorna le righe scritte."""
+        if self._app is None:
+            return 0
+        written = 0
+        with self._flush_lock:
+            while True:
+                rows = self._drain(max(self.flush_every, 1))
+                if not rows:
+                    break
+                try:
+                    # db dall'app registrata: niente `from app import db` (import circolare con app.py)
+                    db = self._app.extensions["sqlalchemy"]
+                    with self._app.app_context():
+                        with db.engine.begin() as conn:
+                            insert_system_logs(conn, rows)
+                except Exception:
+                    # DB non disponibile: perdiamo il lotto, non blocchiamo il processo
+                    self.flush_errors += 1
+                    self.dropped += len(rows)
+                    break
+                written += len(rows)
+                self.flushed += len(rows)
+        return written
+
+    def close(self) -> None:
+        """Ferma il thread e fa l'ultimo flush (shutdown worker)."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            pending = len(self._buf)
+        return {
+            "pending": pending,
+            "capacity": self.capacity,
+            "enqueued": self.enqueued,
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "backpressure": self.backpressure,
+            "flush_errors": self.flush_errors,
+        }
+
+
+system_log_buffer = SystemLogBuffer()
+
+
+def log_event(event: str, detail: Any = None) -> bool:
+    """Scorciatoia per `system_log_buffer.log(...)`."""
+    return system_log_buffer.log(event, detail)
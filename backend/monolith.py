@@ -5,6 +5,7 @@ Sono scritte per evitare import circolari (import locali dentro le funzioni).
 """
 
 from __future__ import annotations
+from datetime import datetime
 from typing import Dict, Any, List, Optional
 
 from sqlalchemy import func
@@ -112,49 +113,90 @@ def list_reservations(rest_id: int, day: Optional[str] = None, q: str = "") -> L
     return out
 
 
+def _parse_slot(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """"date"/"time" del payload ("YYYY-MM-DD" / "HH:MM") -> date/time per app.Reservation."""
+    out: Dict[str, Any] = {}
+    if "date" in payload:
+        out["date"] = datetime.strptime(str(payload["date"]), "%Y-%m-%d").date()
+    if "time" in payload:
+        out["time"] = datetime.strptime(str(payload["time"])[:5], "%H:%M").time()
+    return out
+
+
+def _parse_people(value: Any) -> int:
+    people = int(value)
+    if people < 1:
+        raise ValueError("people deve essere >= 1")
+    return people
+
+
 def create_reservation(rest_id: int, payload: Dict[str, Any]) -> int:
-    """Crea una prenotazione e ritorna l'ID."""
-    from app import db
-    from backend.models import Reservation
+    """Crea una prenotazione (modelli di app.py) e ritorna l'ID."""
+    from app import db, Reservation
+    from backend.log_buffer import log_event
+    slot = _parse_slot(payload)
     r = Reservation(
         restaurant_id=rest_id,
         name=payload["name"],
         phone=payload.get("phone"),
-        people=int(payload.get("people") or 2),
-        status=payload.get("status") or "Confermata",
+        people=_parse_people(payload.get("people") or 2),
+        status=payload.get("status") or "PENDING",
         note=payload.get("note") or "",
-        date=payload["date"],  # "YYYY-MM-DD"
-        time=payload["time"],  # "HH:MM"
+        date=slot["date"],
+        time=slot["time"],
     )
     db.session.add(r)
     db.session.commit()
+    log_event("reservation.created", {"restaurant_id": rest_id, "id": r.id,
+                                      "date": r.date.isoformat(), "time": r.time.strftime("%H:%M")})
     return r.id
 
 
-def update_reservation(rest_id: int, rid: int, payload: Dict[str, Any]) -> None:
-    """Aggiorna una prenotazione esistente."""
-    from app import db
-    from backend.models import Reservation
+def update_reservation(rest_id: int, rid: int, payload: Dict[str, Any]) -> List[int]:
+    """
+    Aggiorna una prenotazione esistente. Se libera coperti (annullata, meno persone
+    o spostata) promuove la lista d'attesa nella stessa transazione.
+    Ritorna gli ID delle voci promosse.
+    """
+    from app import db, Reservation
+    from backend.log_buffer import log_event
+    from backend.waitlist import is_cancelled, promote_waitlist
     r = Reservation.query.filter_by(id=rid, restaurant_id=rest_id).first_or_404()
+    old_slot = (r.date, r.time)
+    old_people = 0 if is_cancelled(r.status) else int(r.people or 0)
     for k in ["name", "phone", "status", "note"]:
         if k in payload:
             setattr(r, k, payload[k])
     if "people" in payload:
-        r.people = int(payload["people"])
-    if "date" in payload:
-        r.date = payload["date"]
-    if "time" in payload:
-        r.time = payload["time"]
+        r.people = _parse_people(payload["people"])
+    for k, v in _parse_slot(payload).items():
+        setattr(r, k, v)
+    # coperti liberati nello slot originale: annullata, meno persone o spostata
+    new_people = 0 if is_cancelled(r.status) else int(r.people or 0)
+    promoted: List[int] = []
+    if old_people and ((r.date, r.time) != old_slot or new_people < old_people):
+        db.session.flush()
+        promoted = promote_waitlist(rest_id, old_slot[0], old_slot[1], commit=False)
     db.session.commit()
+    log_event("reservation.updated", {"restaurant_id": rest_id, "id": rid, "fields": sorted(payload),
+                                      "waitlist_promoted": promoted})
+    return promoted
 
 
-def delete_reservation(rest_id: int, rid: int) -> None:
-    """Elimina una prenotazione."""
-    from app import db
-    from backend.models import Reservation
+def delete_reservation(rest_id: int, rid: int) -> List[int]:
+    """Elimina una prenotazione e promuove la lista d'attesa. Ritorna gli ID promossi."""
+    from app import db, Reservation
+    from backend.log_buffer import log_event
+    from backend.waitlist import is_cancelled, promote_waitlist
     r = Reservation.query.filter_by(id=rid, restaurant_id=rest_id).first_or_404()
+    day, hhmm, freed = r.date, r.time, not is_cancelled(r.status)
     db.session.delete(r)
+    db.session.flush()
+    # stessa transazione: cancellazione e promozioni dalla lista d'attesa insieme
+    promoted = promote_waitlist(rest_id, day, hhmm, commit=False) if freed else []
     db.session.commit()
+    log_event("reservation.deleted", {"restaurant_id": rest_id, "id": rid, "waitlist_promoted": promoted})
+    return promoted
 
 
 # --------------------------------- STATS ----------------------------------- #
@@ -0,0 +1,234 @@
+"""
+Rate limiting in memoria (per processo) a token bucket + scheduler equo.
+
+  limiter = KeyedTokenBuckets(rate=10 / 60, burst=5)   # 10/min, picchi da 5
+  if not limiter.allow(ip):
+      ...  # 429, riprova tra limiter.retry_after(ip) secondi
+
+Le chiavi meno usate vengono scartate oltre `max_keys`, così la memoria resta
+limitata anche con molti IP diversi.
+
+Con più processi (gunicorn --workers=2) i bucket possono essere allineati via
+Redis con `RedisBucketSync` (opzionale); `FairScheduler` limita invece quante
+richieste per chiave girano insieme nello stesso processo.
+"""
+
+from __future__ import annotations
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+
+class TokenBucket:
+    """`burst` gettoni al massimo, ricaricati a `rate` gettoni al secondo."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: Optional[float] = None):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic() if now is None else now
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(now - self.updated, 0.0)
+        self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    def take(self, n: float = 1.0, now: Optional[float] = None) -> bool:
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens >= n:
+            self.tokens -= n
+            return True
+        return False
+
+    def retry_after(self, n: float = 1.0) -> float:
+        """Secondi da attendere perché ci siano `n` gettoni."""
+        missing = n - self.tokens
+        if missing <= 0:
+            return 0.0
+        return missing / self.rate if self.rate > 0 else float("inf")
+
+
+class KeyedTokenBuckets:
+    """Un TokenBucket per chiave (IP, restaurant_id, ...) con LRU limitato."""
+
+    def __init__(self, rate: float, burst: float, max_keys: int = 10000,
+                 sync: Optional["RedisBucketSync"] = None):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.sync = sync
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _bucket(self, key: str) -> TokenBucket:
+        b = self._buckets.get(key)
+        if b is None:
+            b = TokenBucket(self.rate, self.burst)
+            self._buckets[key] = b
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return b
+
+    def allow(self, key: str, n: float = 1.0) -> bool:
+        key = str(key)
+        if self.sync is not None:
+            self.sync.maybe_sync(self)
+        with self._lock:
+            ok = self._bucket(key).take(n)
+        if ok and self.sync is not None:
+            self.sync.record(key, n)
+        return ok
+
+    def charge(self, key: str, n: float) -> None:
+        """Scala `n` gettoni consumati altrove (altri processi), senza andare sotto -burst."""
+        with self._lock:
+            b = self._bucket(str(key))
+            b._refill(time.monotonic())
+            b.tokens = max(b.tokens - n, -b.burst)
+
+    def retry_after(self, key: str, n: float = 1.0) -> float:
+        """Secondi prima che `key` abbia `n` gettoni (0 = passerebbe ora), senza consumarli."""
+        with self._lock:
+            b = self._buckets.get(str(key))
+            if b is None:
+                return 0.0
+            b._refill(time.monotonic())
+            return b.retry_after(n)
+
+
+class RedisBucketSync:
+    """
+    Allinea i KeyedTokenBuckets di più processi tramite Redis (opzionale).
+
+    Ogni processo pubblica ogni `interval` secondi il proprio consumo per chiave
+    in un hash per-minuto (HINCRBYFLOAT) e legge il totale: quanto consumato
+    dagli altri processi viene scalato dal bucket locale. Le decisioni restano
+    locali (nessun round trip per richiesta); se Redis non risponde si prosegue
+    solo in memoria.
+    """
+
+    def __init__(self, client, prefix: str = "rl", interval: float = 0.5):
+        self.client = client
+        self.prefix = prefix
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._pending: Counter = Counter()  # consumo locale non ancora pubblicato
+        self._mine: Counter = Counter()     # consumo locale pubblicato nella finestra
+        self._seen: Counter = Counter()     # consumo remoto già scalato nella finestra
+        self._window = 0
+        self._last = 0.0
+
+    def record(self, key: str, n: float) -> None:
+        with self._lock:
+            self._pending[key] += n
+
+    def maybe_sync(self, buckets: "KeyedTokenBuckets") -> None:
+        now = time.monotonic()
+        if now - self._last < self.interval:
+            return
+        with self._lock:
+            if now - self._last < self.interval:
+                return
+            self._last = now
+            window = int(time.time() // 60)
+            if window != self._window:
+                self._window = window
+                self._mine.clear()
+                self._seen.clear()
+            pending, self._pending = self._pending, Counter()
+
+        name = f"{self.prefix}:{window}"
+        try:
+            pipe = self.client.pipeline()
+            for key, n in pending.items():
+                pipe.hincrbyfloat(name, key, n)
+            pipe.expire(name, 120)
+            pipe.hgetall(name)
+            totals = pipe.execute()[-1]
+        except Exception:
+            with self._lock:
+                self._pending.update(pending)
+            return
+
+        with self._lock:
+            self._mine.update(pending)
+            for raw_key, raw_total in (totals or {}).items():
+                key = raw_key.decode() if isinstance(raw_key, bytes) else str(raw_key)
+                remote = float(raw_total) - self._mine[key]
+                delta = remote - self._seen[key]
+                if delta > 0:
+                    self._seen[key] = remote
+                    buckets.charge(key, delta)
+
+
+class FairScheduler:
+    """
+    Limita le richieste contemporanee per chiave (es. restaurant_id) in un processo.
+
+    Ogni chiave attiva ha al massimo una quota equa degli slot,
+    `capacity // chiavi_attive` (min 1, max `per_key_max`). Una chiave calda non
+    può quindi occupare tutti i thread mentre altre aspettano. Chi supera la
+    quota attende fino a `timeout` secondi, poi viene rifiutato.
+    """
+
+    def __init__(self, capacity: int, per_key_max: Optional[int] = None):
+        self.capacity = max(int(capacity), 1)
+        self.per_key_max = per_key_max
+        self._cond = threading.Condition()
+        self._inflight: Counter = Counter()
+        self._waiting: Counter = Counter()
+        self._total = 0
+
+    def _share(self) -> int:
+        active = len(set(self._inflight) | set(self._waiting))
+        share = max(1, self.capacity // max(active, 1))
+        if self.per_key_max:
+            share = min(share, self.per_key_max)
+        return share
+
+    def _can_run(self, key: str) -> bool:
+        return self._total < self.capacity and self._inflight[key] < self._share()
+
+    def acquire(self, key: str, timeout: float = 0.0) -> bool:
+        key = str(key)
+        with self._cond:
+            self._waiting[key] += 1
+            try:
+                ok = self._cond.wait_for(lambda: self._can_run(key), timeout)
+                if ok:
+                    self._inflight[key] += 1
+                    self._total += 1
+                return ok
+            finally:
+                self._waiting[key] -= 1
+                if self._waiting[key] <= 0:
+                    del self._waiting[key]
+
+    def release(self, key: str) -> None:
+        key = str(key)
+        with self._cond:
+            self._inflight[key] -= 1
+            if self._inflight[key] <= 0:
+                del self._inflight[key]
+            self._total -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, key: str, timeout: float = 0.0) -> Iterator[bool]:
+        ok = self.acquire(key, timeout)
+        try:
+            yield ok
+        finally:
+            if ok:
+                self.release(key)
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {"total": self._total, "capacity": self.capacity, "share": self._share(),
+                    **{f"inflight:{k}": v for k, v in self._inflight.items()}}
@@ -0,0 +1,56 @@
+"""
+API prenotazioni: modifica e cancellazione dalla dashboard (main.js).
+
+  PUT    /api/reservations/<id>   -> backend.monolith.update_reservation
+  DELETE /api/reservations/<id>   -> backend.monolith.delete_reservation
+
+Entrambe lavorano sui modelli di app.py e, quando si liberano coperti, promuovono
+la lista d'attesa nella stessa transazione (backend.waitlist.promote_waitlist).
+"""
+
+from __future__ import annotations
+
+from flask import Blueprint, jsonify, request
+from flask_login import current_user, login_required
+
+from backend.tenancy import tenant_limited
+
+bp_reservations = Blueprint("reservations", __name__, url_prefix="/api/reservations")
+
+
+@bp_reservations.put("/<int:rid>")
+@login_required
+@tenant_limited("reservations", lambda: current_user.restaurant_id)
+def update_reservation_view(rid: int):
+    """
+    Body JSON (campi opzionali):
+    { "name": "...", "phone": "...", "people": 4, "date": "YYYY-MM-DD", "time": "HH:MM",
+      "status": "CANCELLED", "note": "" }
+
+    Ritorna:
+    { "ok": true, "id": 7, "waitlist_promoted": [12] }
+    """
+    from app import db
+    from backend.monolith import update_reservation
+
+    data = request.get_json(force=True, silent=True) or {}
+    try:
+        promoted = update_reservation(current_user.restaurant_id, rid, data)
+    except (TypeError, ValueError):
+        db.session.rollback()
+        return jsonify(ok=False, error="dati non validi (people, date, time)"), 400
+    return jsonify(ok=True, id=rid, waitlist_promoted=promoted)
+
+
+@bp_reservations.delete("/<int:rid>")
+@login_required
+@tenant_limited("reservations", lambda: current_user.restaurant_id)
+def delete_reservation_view(rid: int):
+    """
+    Ritorna:
+    { "ok": true, "id": 7, "waitlist_promoted": [12] }
+    """
+    from backend.monolith import delete_reservation
+
+    promoted = delete_reservation(current_user.restaurant_id, rid)
+    return jsonify(ok=True, id=rid, waitlist_promoted=promoted)
@@ -0,0 +1,113 @@
+"""
+Isolamento tra ristoranti: rate limit e concorrenza per `restaurant_id`.
+
+  @bp.post("/acquire")
+  @tenant_limited("voice", lambda: (request.get_json(silent=True) or {}).get("restaurant_id"))
+  def acquire_slot(): ...
+
+Ogni ristorante ha:
+  - per ogni ambito ("voice", "reservations") un token bucket (TENANT_RATE_PER_MIN /
+    TENANT_BURST), allineabile tra processi via Redis se REDIS_URL è impostato e il
+    pacchetto `redis` è installato;
+  - una quota equa dei thread del processo (un solo FairScheduler condiviso da tutti
+    gli ambiti, così in totale non si superano i TENANT_CAPACITY slot): un ristorante
+    in picco non può prenderli tutti, gli altri passano comunque.
+
+Oltre i limiti si risponde 429 con Retry-After, senza toccare il DB.
+"""
+
+from __future__ import annotations
+import os
+import threading
+from functools import wraps
+from typing import Any, Callable, Dict, Optional
+
+from flask import current_app, jsonify
+
+from backend.ratelimit import FairScheduler, KeyedTokenBuckets, RedisBucketSync
+
+try:  # opzionale
+    import redis  # type: ignore
+except ImportError:  # pragma: no cover
+    redis = None
+
+
+class TenantLimiter:
+
+    def __init__(self):
+        self.buckets: Dict[str, KeyedTokenBuckets] = {}
+        self.scheduler = FairScheduler(capacity=4, per_key_max=2)
+        self.timeout = 0.25
+        self._sync_client = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        cfg = app.config
+        cfg.setdefault("TENANT_RATE_PER_MIN", 120)
+        cfg.setdefault("TENANT_BURST", 30)
+        cfg.setdefault("TENANT_CAPACITY", 4)        # = gunicorn --threads
+        cfg.setdefault("TENANT_MAX_INFLIGHT", 2)    # richieste contemporanee per ristorante
+        cfg.setdefault("TENANT_QUEUE_TIMEOUT", 0.25)
+        cfg.setdefault("REDIS_URL", os.getenv("REDIS_URL"))
+
+        self.timeout = float(cfg["TENANT_QUEUE_TIMEOUT"])
+        self.scheduler = FairScheduler(
+            capacity=int(cfg["TENANT_CAPACITY"]),
+            per_key_max=int(cfg["TENANT_MAX_INFLIGHT"]),
+        )
+        if cfg["REDIS_URL"] and redis is not None:
+            self._sync_client = redis.Redis.from_url(cfg["REDIS_URL"], socket_timeout=0.2)
+        app.extensions["tenant_limiter"] = self
+
+    def _get(self, scope: str):
+        with self._lock:
+            if scope not in self.buckets:
+                self._create(scope)
+        return self.buckets[scope], self.scheduler
+
+    def _create(self, scope: str) -> None:
+        cfg = current_app.config
+        sync = RedisBucketSync(self._sync_client, prefix=f"rl:{scope}") if self._sync_client else None
+        self.buckets[scope] = KeyedTokenBuckets(
+            rate=float(cfg["TENANT_RATE_PER_MIN"]) / 60,
+            burst=float(cfg["TENANT_BURST"]),
+            sync=sync,
+        )
+
+
+tenant_limiter = TenantLimiter()
+
+
+def _too_many(msg: str, retry_after: float):
+    resp = jsonify(ok=False, error=msg)
+    resp.status_code = 429
+    resp.headers["Retry-After"] = str(max(int(retry_after + 0.999), 1))
+    return resp
+
+
+def tenant_limited(scope: str, tenant: Callable[[], Optional[Any]]):
+    """
+    Applica rate limit + quota equa per ristorante alla view.
+    `tenant()` ritorna il restaurant_id della richiesta (None = nessun limite,
+    la view gestirà da sola il 400).
+    """
+    def deco(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                rid = tenant()
+            except (TypeError, ValueError):
+                rid = None
+            if not rid:
+                return view(*args, **kwargs)
+
+            key = str(rid)
+            buckets, scheduler = tenant_limiter._get(scope)
+            if not buckets.allow(key):
+                return _too_many("troppe richieste per questo ristorante", buckets.retry_after(key))
+            with scheduler.slot(key, tenant_limiter.timeout) as ok:
+                if not ok:
+                    return _too_many("ristorante occupato, riprova", 1)
+                return view(*args, **kwargs)
+        return wrapper
+    return deco
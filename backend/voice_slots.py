@@ -1,6 +1,7 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from sqlalchemy import text
-from app import db
+from backend.log_buffer import log_event
+from backend.tenancy import tenant_limited
 
 bp_voice_slots = Blueprint("voice_slots", __name__, url_prefix="/api/voice/slot")
 
@@ -14,7 +15,12 @@ def _bool(v):
     return False
 
 
+def _body_restaurant_id():
+    return int((request.get_json(force=True, silent=True) or {}).get("restaurant_id") or 0)
+
+
 @bp_voice_slots.post("/acquire")
+@tenant_limited("voice", _body_restaurant_id)
 def acquire_slot():
     """
     Body JSON:
@@ -27,15 +33,24 @@ def acquire_slot():
     Ritorna:
     { "restaurant_id": 1, "call_sid": "CA_xxx", "overload": false }
     """
+    from app import db
+
     data = request.get_json(force=True, silent=True) or {}
 
     rid = int(data.get("restaurant_id") or 0)
     csid = (data.get("call_sid") or "").strip()
-    max_calls = int(data.get("max") or 3)
 
     if not rid or not csid:
         return jsonify(error="restaurant_id e call_sid sono obbligatori"), 400
 
+    # `max` arriva dal client: lo limitiamo in [1, VOICE_MAX_CALLS_CAP] per non far
+    # monopolizzare le linee (e con max <= 0 ogni chiamata sarebbe in overload)
+    try:
+        max_calls = int(data.get("max") or 3)
+    except (TypeError, ValueError):
+        return jsonify(error="max non valido"), 400
+    max_calls = max(1, min(max_calls, int(current_app.config.get("VOICE_MAX_CALLS_CAP", 10))))
+
     try:
         # Chiama la funzione SQL (creata via 2025-10-active-calls.sql)
         # acquire_slot(rid, call_sid, max) -> boolean (TRUE se overload)
@@ -46,6 +61,8 @@ def acquire_slot():
 
         overload = _bool(res["overload"]) if res is not None else True
         db.session.commit()
+        log_event("call.overload" if overload else "call.acquire",
+                  {"restaurant_id": rid, "call_sid": csid, "max": max_calls})
 
         return jsonify(
             restaurant_id=rid,
@@ -104,6 +121,8 @@ def release_slot():
     Ritorna:
     { "released": true }
     """
+    from app import db
+
     data = request.get_json(force=True, silent=True) or {}
     csid = (data.get("call_sid") or "").strip()
 
@@ -119,6 +138,8 @@ def release_slot():
 
         released = _bool(res["released"]) if res is not None else False
         db.session.commit()
+        if released:
+            log_event("call.release", {"call_sid": csid})
         return jsonify(released=released, version="pg-func-1")
     except Exception as e:
         db.session.rollback()
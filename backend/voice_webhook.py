@@ -0,0 +1,35 @@
+from flask import Blueprint, request, jsonify
+from backend.jobs import enqueue
+
+bp_voice_webhook = Blueprint("voice_webhook", __name__, url_prefix="/api/voice")
+
+
+@bp_voice_webhook.post("/webhook")
+def voice_webhook():
+    """
+    Body JSON (vedi tests/req.json):
+    {
+      "call_sid": "CA_xxx",
+      "recording_url": "https://...",
+      "transcript": "...",
+      ...
+    }
+
+    Ritorna subito 202: il lavoro vero lo fa il worker (backend.jobs).
+    { "ok": true, "job_id": 123 }
+    """
+    from app import db
+
+    data = request.get_json(force=True, silent=True) or {}
+    csid = (data.get("call_sid") or "").strip()
+
+    if not csid:
+        return jsonify(ok=False, error="call_sid è obbligatorio"), 400
+
+    try:
+        job_id = enqueue("call.recording", data)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify(ok=False, error=f"enqueue failed: {e}"), 500
+
+    return jsonify(ok=True, job_id=job_id), 202
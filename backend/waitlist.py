@@ -0,0 +1,253 @@
+"""
+Lista d'attesa con promozione automatica quando si liberano coperti.
+
+Ogni volta che `update_reservation` / `delete_reservation` (backend.monolith,
+PUT/DELETE /api/reservations/<id>) liberano posti, `promote_waitlist()` gira
+NELLA STESSA transazione:
+  1. blocca le Settings del ristorante (FOR UPDATE) per serializzare le promozioni;
+  2. legge le voci WAITING nella finestra [ora - W, ora + W] del posto liberato
+     dall'indice (restaurant_id, date, time), in ordine di arrivo;
+  3. per ciascuna somma i coperti già prenotati nella finestra intorno al SUO
+     orario e la promuove solo se ci sta nella capienza (Settings.capacity_max),
+     creando la prenotazione e accodando l'evento "waitlist.promoted" (backend.jobs).
+
+Tutte le letture sono range scan sull'indice, quindi il costo per ogni
+cancellazione è O(k log n) (k = voci nella finestra, max MAX_CANDIDATES):
+non si rilegge la giornata.
+Se il commit fallisce, prenotazioni, promozioni ed evento vengono annullati insieme.
+"""
+
+from __future__ import annotations
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Union
+
+from flask import Blueprint, current_app, jsonify, request
+from flask_login import current_user, login_required
+from sqlalchemy import func
+
+from backend.tenancy import tenant_limited
+
+bp_waitlist = Blueprint("waitlist", __name__, url_prefix="/api/waitlist")
+
+CANCELLED = ("ANNULLATA", "CANCELLED", "CANCELLATA")
+DEFAULT_WINDOW_MINUTES = 30
+MAX_CANDIDATES = 50
+
+
+def is_cancelled(status: Optional[str]) -> bool:
+    return (status or "").upper() in CANCELLED
+
+
+def _as_date(day: Union[str, date]) -> date:
+    return day if isinstance(day, date) else datetime.strptime(day, "%Y-%m-%d").date()
+
+
+def _as_time(hhmm: Union[str, time]) -> time:
+    return hhmm if isinstance(hhmm, time) else datetime.strptime(hhmm[:5], "%H:%M").time()
+
+
+def _window(hhmm: time, minutes: int):
+    """(20:00, 30) -> (19:30, 20:30), senza uscire dalla giornata."""
+    t = datetime.combine(date.min, hhmm)
+    day_start = t.replace(hour=0, minute=0)
+    day_end = t.replace(hour=23, minute=59)
+    lo = max(t - timedelta(minutes=minutes), day_start)
+    hi = min(t + timedelta(minutes=minutes), day_end)
+    return lo.time(), hi.time()
+
+
+def promote_waitlist(rest_id: int, day: Union[str, date], hhmm: Union[str, time],
+                     window_minutes: Optional[int] = None, commit: bool = True) -> List[int]:
+    """
+    Promuove le voci in attesa che ora entrano in capienza per `day` intorno a `hhmm`.
+    Ritorna gli ID delle voci promosse. Con commit=False lavora nella transazione
+    del chiamante (così la cancellazione e le promozioni sono atomiche).
+    """
+    from app import db, Reservation, Settings, WaitlistEntry
+    from backend.jobs import enqueue
+
+    day, hhmm = _as_date(day), _as_time(hhmm)
+    if window_minutes is None:
+        window_minutes = int(current_app.config.get("WAITLIST_WINDOW_MINUTES", DEFAULT_WINDOW_MINUTES))
+
+    # 1) lock per ristorante: due cancellazioni contemporanee non promuovono due volte
+    s = (Settings.query.filter_by(restaurant_id=rest_id)
+         .with_for_update().first())
+    if not s or not s.capacity_max:
+        return []
+
+    capacity = int(s.capacity_max)
+    lo, hi = _window(hhmm, window_minutes)
+
+    def booked_around(t: time) -> int:
+        """Coperti attivi nella finestra [t - W, t + W] (range scan su idx_reservation_rest_date)."""
+        t_lo, t_hi = _window(t, window_minutes)
+        return int(db.session.query(func.coalesce(func.sum(Reservation.people), 0)).filter(
+            Reservation.restaurant_id == rest_id,
+            Reservation.date == day,
+            Reservation.time >= t_lo,
+            Reservation.time <= t_hi,
+            func.upper(func.coalesce(Reservation.status, "")).notin_(CANCELLED),
+        ).scalar() or 0)
+
+    # 2) candidati in attesa nella finestra del posto liberato, in ordine di arrivo
+    #    (range scan su idx_waitlist_*): solo loro possono aver guadagnato capienza
+    candidates = (
+        WaitlistEntry.query.filter(
+            WaitlistEntry.restaurant_id == rest_id,
+            WaitlistEntry.date == day,
+            WaitlistEntry.time >= lo,
+            WaitlistEntry.time <= hi,
+            WaitlistEntry.status == "WAITING",
+            WaitlistEntry.people <= capacity,
+        )
+        .order_by(WaitlistEntry.created_at.asc(), WaitlistEntry.id.asc())
+        .limit(MAX_CANDIDATES)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+    # 3) promozione greedy FIFO: ogni voce deve stare nella capienza della finestra
+    #    intorno al PROPRIO orario (le promozioni precedenti sono già flush-ate e contano)
+    promoted: List[int] = []
+    now = datetime.utcnow()
+    for w in candidates:
+        if booked_around(w.time) + w.people > capacity:
+            continue
+        r = Reservation(
+            restaurant_id=rest_id,
+            name=w.name,
+            phone=w.phone,
+            people=w.people,
+            note=w.note or "",
+            date=w.date,
+            time=w.time,
+        )
+        db.session.add(r)
+        db.session.flush()
+        w.status = "PROMOTED"
+        w.reservation_id = r.id
+        w.promoted_at = now
+        promoted.append(w.id)
+        # evento nella stessa transazione: parte solo se la promozione va a buon fine
+        enqueue("waitlist.promoted", {
+            "restaurant_id": rest_id,
+            "waitlist_id": w.id,
+            "reservation_id": r.id,
+            "name": w.name,
+            "phone": w.phone,
+            "people": w.people,
+            "date": w.date.isoformat(),
+            "time": w.time.strftime("%H:%M"),
+        }, commit=False)
+
+    if commit:
+        db.session.commit()
+    return promoted
+
+
+def add_to_waitlist(rest_id: int, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Aggiunge una voce e prova subito a promuoverla (se c'è già posto)."""
+    from app import db, WaitlistEntry
+
+    people = int(payload.get("people", 2))
+    if people < 1:
+        raise ValueError("people deve essere >= 1")  # altrimenti la promozione "libera" coperti
+    w = WaitlistEntry(
+        restaurant_id=rest_id,
+        name=payload["name"],
+        phone=payload.get("phone"),
+        people=people,
+        note=payload.get("note") or "",
+        date=_as_date(payload["date"]),  # "YYYY-MM-DD"
+        time=_as_time(payload["time"]),  # "HH:MM"
+    )
+    db.session.add(w)
+    db.session.flush()
+    promoted = promote_waitlist(rest_id, w.date, w.time, commit=False)
+    db.session.commit()
+    return {"id": w.id, "promoted": w.id in promoted, "reservation_id": w.reservation_id}
+
+
+def _entry_dict(w) -> Dict[str, Any]:
+    return {
+        "id": w.id,
+        "date": w.date.isoformat(),
+        "time": w.time.strftime("%H:%M"),
+        "name": w.name,
+        "phone": w.phone,
+        "people": w.people,
+        "note": w.note,
+        "status": w.status,
+        "reservation_id": w.reservation_id,
+    }
+
+
+# -------------------------------- API -------------------------------------- #
+
+@bp_waitlist.get("")
+@login_required
+@tenant_limited("reservations", lambda: current_user.restaurant_id)
+def list_waitlist():
+    """
+    Query string: ?date=YYYY-MM-DD (opzionale), ?all=1 per includere le voci promosse
+
+    Ritorna:
+    { "ok": true, "items": [ {...}, ... ] }
+    """
+    from app import WaitlistEntry
+
+    q = WaitlistEntry.query.filter_by(restaurant_id=current_user.restaurant_id)
+    day = (request.args.get("date") or "").strip()
+    if day:
+        try:
+            q = q.filter(WaitlistEntry.date == _as_date(day))
+        except ValueError:
+            return jsonify(ok=False, error="data non valida"), 400
+    if not request.args.get("all"):
+        q = q.filter(WaitlistEntry.status == "WAITING")
+    items = q.order_by(WaitlistEntry.date.asc(), WaitlistEntry.time.asc(), WaitlistEntry.created_at.asc()).all()
+    return jsonify(ok=True, items=[_entry_dict(w) for w in items])
+
+
+@bp_waitlist.post("")
+@login_required
+@tenant_limited("reservations", lambda: current_user.restaurant_id)
+def create_waitlist_entry():
+    """
+    Body JSON:
+    { "date": "YYYY-MM-DD", "time": "HH:MM", "name": "...", "phone": "...", "people": 4, "note": "" }
+
+    Ritorna:
+    { "ok": true, "id": 12, "promoted": false, "reservation_id": null }
+    """
+    from app import db
+
+    data = request.get_json(force=True, silent=True) or {}
+    if not data.get("name") or not data.get("date") or not data.get("time"):
+        return jsonify(ok=False, error="name, date e time sono obbligatori"), 400
+    people = data.get("people", 2)
+    if isinstance(people, bool) or not isinstance(people, int) or people < 1:
+        return jsonify(ok=False, error="people deve essere un intero >= 1"), 400
+    try:
+        _as_date(data["date"])
+        _as_time(data["time"])
+        out = add_to_waitlist(current_user.restaurant_id, data)
+    except ValueError:
+        db.session.rollback()
+        return jsonify(ok=False, error="data/ora non valide"), 400
+    return jsonify(ok=True, **out)
+
+
+@bp_waitlist.delete("/<int:wid>")
+@login_required
+@tenant_limited("reservations", lambda: current_user.restaurant_id)
+def delete_waitlist_entry(wid: int):
+    """Rimuove una voce dalla lista d'attesa (resta in tabella come REMOVED)."""
+    from app import db, WaitlistEntry
+
+    w = WaitlistEntry.query.filter_by(id=wid, restaurant_id=current_user.restaurant_id).first_or_404()
+    if w.status == "WAITING":
+        w.status = "REMOVED"
+        db.session.commit()
+    return jsonify(ok=True, id=wid, status=w.status)
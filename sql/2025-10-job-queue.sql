@@ -0,0 +1,24 @@
+-- Coda lavori asincroni (trascrizioni, notifiche, log)
+-- Consumata da: python -m backend.jobs  (vedi Procfile -> worker)
+CREATE TABLE IF NOT EXISTS job_queue (
+  id SERIAL PRIMARY KEY,
+  kind VARCHAR(60) NOT NULL,
+  payload TEXT,
+  status VARCHAR(20) NOT NULL DEFAULT 'queued',
+  attempts INTEGER NOT NULL DEFAULT 0,
+  max_attempts INTEGER NOT NULL DEFAULT 5,
+  run_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  locked_at TIMESTAMP,
+  last_error TEXT,
+  created_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Indice parziale: il worker legge solo i lavori pronti, in ordine di run_at
+CREATE INDEX IF NOT EXISTS idx_job_queue_ready
+  ON job_queue (run_at, id)
+  WHERE status = 'queued';
+
+-- Recupero lavori rimasti "running" dopo un crash del worker
+CREATE INDEX IF NOT EXISTS idx_job_queue_running
+  ON job_queue (locked_at)
+  WHERE status = 'running';
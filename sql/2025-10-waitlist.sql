@@ -0,0 +1,25 @@
+-- Lista d'attesa: promossa automaticamente quando si liberano coperti
+-- (vedi backend/waitlist.py)
+CREATE TABLE IF NOT EXISTS waitlist (
+  id SERIAL PRIMARY KEY,
+  restaurant_id INTEGER NOT NULL REFERENCES restaurant(id),
+  name VARCHAR(120) NOT NULL,
+  phone VARCHAR(40),
+  people INTEGER NOT NULL DEFAULT 2,
+  note TEXT,
+  date DATE NOT NULL,
+  time TIME NOT NULL,
+  status VARCHAR(20) NOT NULL DEFAULT 'WAITING',
+  reservation_id INTEGER REFERENCES reservation(id),
+  created_at TIMESTAMP DEFAULT NOW(),
+  promoted_at TIMESTAMP
+);
+
+-- Ricerca per finestra (ristorante, giorno, orario): range scan sull'indice
+CREATE INDEX IF NOT EXISTS idx_waitlist_rest_date_time
+  ON waitlist (restaurant_id, date, time);
+
+-- Solo le voci ancora in attesa, in ordine di arrivo
+CREATE INDEX IF NOT EXISTS idx_waitlist_waiting
+  ON waitlist (restaurant_id, date, time, created_at)
+  WHERE status = 'WAITING';
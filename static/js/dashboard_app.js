@@ -52,6 +52,14 @@
   });
   $("#btnFilter")?.addEventListener("click", load);
 
+  // Dati iniziali incorporati dal server (vedi backend/bootstrap.py)
+  let boot = null;
+  try {
+    boot = JSON.parse($("#bootstrapData")?.textContent || "null");
+  } catch (e) {
+    boot = null;
+  }
+
   // Load prenotazioni
   async function load() {
     const v = inputDate.value.trim();
@@ -60,8 +68,15 @@
     if (ddmmyyyy) {
       param = `${ddmmyyyy[3]}-${ddmmyyyy[2]}-${ddmmyyyy[1]}`;
     }
-    const res = await fetch(`/api/reservations?date=${encodeURIComponent(param)}`);
-    const js = await res.json();
+    let js;
+    if (boot && boot.day === param) {
+      // primo caricamento: niente round trip
+      js = { ok: true, items: boot.reservations };
+      boot = null;
+    } else {
+      const res = await fetch(`/api/reservations?date=${encodeURIComponent(param)}`);
+      js = await res.json();
+    }
     rows.innerHTML = "";
     if (!js.ok) {
       rows.innerHTML = `<div class="tr"><div class="td col2">Errore caricamento</div></div>`;
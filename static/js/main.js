@@ -46,6 +46,33 @@ if (themeBtn) {
   });
 }
 
+// ---------------- Bootstrap ----------------
+// Dati iniziali incorporati nella pagina (o presi da /api/bootstrap con una
+// sola richiesta): ogni sezione li usa al primo caricamento, poi fa fetch.
+let bootData = null;
+try {
+  bootData = JSON.parse(document.getElementById("bootstrapData")?.textContent || "null");
+} catch (e) {
+  bootData = null;
+}
+let bootPromise = null;
+
+async function fromBootstrap(key, url) {
+  if (!bootData && !bootPromise) {
+    bootPromise = fetch("/api/bootstrap").then(r => r.json()).then(js => { bootData = js; });
+  }
+  if (!bootData && bootPromise) {
+    try { await bootPromise; } catch (e) { /* fallback sotto */ }
+  }
+  if (bootData && key in bootData) {
+    const v = bootData[key];
+    delete bootData[key];
+    return v;
+  }
+  const res = await fetch(url);
+  return res.json();
+}
+
 // ---------------- Toast ----------------
 function showToast(msg, type = "ok") {
   const toast = document.createElement("div");
@@ -63,6 +90,7 @@ const listBox = document.getElementById("reservationsList");
 const addBtn = document.getElementById("addReservation");
 
 async function loadReservations() {
+  // lista completa (il bootstrap contiene solo il giorno corrente)
   const res = await fetch("/api/reservations");
   const data = await res.json();
   if (!data.length) {
@@ -168,8 +196,7 @@ function closeModal() {
 // Orari Settimanali
 // ===========================================================
 async function loadHours() {
-  const res = await fetch("/api/hours");
-  const data = await res.json();
+  const data = await fromBootstrap("hours", "/api/hours");
   const box = document.getElementById("hoursEditor");
   const giorni = ["Lun", "Mar", "Mer", "Gio", "Ven", "Sab", "Dom"];
   box.innerHTML = giorni.map((g, i) => `
@@ -195,8 +222,7 @@ async function saveHours() {
 // Giorni speciali
 // ===========================================================
 async function loadSpecialDays() {
-  const res = await fetch("/api/special-days");
-  const data = await res.json();
+  const data = await fromBootstrap("special_days", "/api/special-days");
   const box = document.getElementById("specialDays");
   box.innerHTML = data.map(d => `
     <div class="form-row">
@@ -211,8 +237,7 @@ async function loadSpecialDays() {
 // Impostazioni / Prezzi
 // ===========================================================
 async function loadSettings() {
-  const res = await fetch("/api/settings");
-  const s = await res.json();
+  const s = await fromBootstrap("settings", "/api/settings");
   const box = document.getElementById("settingsBox");
   box.innerHTML = `
     <div class="form-row"><label>Prezzo Medio</label><input id="set-price" type="number" value="${s.avg_price || ""}"></div>
@@ -246,8 +271,7 @@ async function saveSettings() {
 // Menu
 // ===========================================================
 async function loadMenu() {
-  const res = await fetch("/api/menu");
-  const data = await res.json();
+  const data = await fromBootstrap("menu", "/api/menu");
   const box = document.getElementById("menuList");
   if (!data.length) {
     box.innerHTML = `<p class='text-muted'>Nessun piatto nel menu.</p>`;
@@ -312,8 +336,7 @@ async function deleteMenuItem(id) {
 // Statistiche
 // ===========================================================
 async function loadStats() {
-  const res = await fetch("/api/stats");
-  const stats = await res.json();
+  const stats = await fromBootstrap("stats", "/api/stats");
   const box = document.getElementById("statsBox");
   box.innerHTML = `
     <p>Prenotazioni oggi: <b>${stats.today_count}</b></p>
@@ -330,8 +353,7 @@ async function loadStats() {
 let chartBookings, chartPeople;
 
 async function loadStats() {
-  const res = await fetch("/api/stats");
-  const stats = await res.json();
+  const stats = await fromBootstrap("stats", "/api/stats");
   const box = document.getElementById("statsBox");
   box.innerHTML = `
     <p>Prenotazioni oggi: <b>${stats.today_count}</b></p>
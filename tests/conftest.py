@@ -0,0 +1,82 @@
+import os
+import sys
+import tempfile
+
+import pytest
+from sqlalchemy import text
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# app.py legge DATABASE_URL all'import: SQLite temporaneo per i test
+_DB_FILE = os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_FILE}")
+os.environ.setdefault("PASSWORD_HASH_METHOD", "pbkdf2:sha256:1000")
+
+
+@pytest.fixture()
+def app_ctx():
+    from app import app, db
+
+    app.config["TESTING"] = True
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture()
+def client(app_ctx):
+    return app_ctx.test_client()
+
+
+@pytest.fixture()
+def restaurant(app_ctx):
+    from app import db, Restaurant, Settings, User
+
+    r = Restaurant(name="Trattoria Test", logo_path="img/logo.png")
+    db.session.add(r)
+    db.session.flush()
+    db.session.add(Settings(restaurant_id=r.id, avg_price_lunch=20, avg_price_dinner=35, capacity_max=10))
+    db.session.add(User(username="test", password="test", restaurant_id=r.id))
+    db.session.commit()
+    return r
+
+
+@pytest.fixture()
+def logged_client(client, restaurant):
+    from app import User
+
+    user = User.query.filter_by(username="test").first()
+    with client.session_transaction() as sess:
+        sess["_user_id"] = str(user.id)
+        sess["_fresh"] = True
+    return client
+
+
+@pytest.fixture()
+def job_queue(app_ctx):
+    # versione SQLite di sql/2025-10-job-queue.sql (backend.jobs.enqueue usa SQL grezzo)
+    from app import db
+
+    with db.engine.begin() as conn:
+        conn.execute(text(
+            """
+            CREATE TABLE IF NOT EXISTS job_queue (
+              id INTEGER PRIMARY KEY AUTOINCREMENT,
+              kind VARCHAR(60) NOT NULL,
+              payload TEXT,
+              status VARCHAR(20) NOT NULL DEFAULT 'queued',
+              attempts INTEGER NOT NULL DEFAULT 0,
+              max_attempts INTEGER NOT NULL DEFAULT 5,
+              run_at TIMESTAMP NOT NULL,
+              locked_at TIMESTAMP,
+              last_error TEXT,
+              created_at TIMESTAMP
+            )
+            """
+        ))
+    yield
+    with db.engine.begin() as conn:
+        conn.execute(text("DROP TABLE job_queue"))
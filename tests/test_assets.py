@@ -0,0 +1,58 @@
+import gzip
+
+import pytest
+from flask import Flask, url_for
+
+from backend import assets
+
+JS = b"console.log('prenotazioni');\n" * 20
+
+
+@pytest.fixture()
+def client(tmp_path):
+    static = tmp_path / "static"
+    (static / "js").mkdir(parents=True)
+    (static / "js" / "main.js").write_bytes(JS)
+    manifest = assets.build(str(static))
+
+    app = Flask(__name__, static_folder=str(static))
+    app.config["ASSETS_WHITENOISE"] = False
+    assets.init_app(app)
+    with app.test_request_context():
+        yield app.test_client(), manifest
+
+
+def test_url_for_points_to_hashed_file(client):
+    _, manifest = client
+    url = url_for("static", filename="js/main.js")
+    assert url == "/static/" + manifest["js/main.js"]
+    assert url.startswith("/static/dist/js/main.") and url.endswith(".js")
+    # file non in manifest: URL invariato
+    assert url_for("static", filename="css/none.css") == "/static/css/none.css"
+
+
+def test_variant_selection_and_immutable_cache(client):
+    c, manifest = client
+    url = "/static/" + manifest["js/main.js"]
+
+    res = c.get(url, headers={"Accept-Encoding": "gzip"})
+    assert res.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(res.get_data()) == JS
+    assert res.headers["Cache-Control"] == assets.IMMUTABLE
+    assert res.headers["Vary"] == "Accept-Encoding"
+    assert res.mimetype in ("text/javascript", "application/javascript")
+
+    res = c.get(url, headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in res.headers
+    assert res.get_data() == JS
+
+    if assets.brotli is not None:
+        assert c.get(url, headers={"Accept-Encoding": "gzip, br"}).headers["Content-Encoding"] == "br"
+
+
+def test_manifest_is_not_served_as_immutable(client):
+    c, _ = client
+    assert c.get("/static/dist/" + assets.MANIFEST).status_code == 404
+    assert c.get("/static/dist/manifest.json").status_code == 404
+    res = c.get("/static/" + assets.MANIFEST)
+    assert "immutable" not in res.headers.get("Cache-Control", "")
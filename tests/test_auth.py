@@ -0,0 +1,55 @@
+import threading
+
+import pytest
+
+from backend.auth import LoginBusy, PasswordHasher, password_hasher
+
+
+@pytest.fixture()
+def hasher(app_ctx):
+    saved = {k: app_ctx.config.get(k) for k in ("LOGIN_HASH_WORKERS", "LOGIN_HASH_QUEUE")}
+    app_ctx.config.update(LOGIN_HASH_WORKERS=1, LOGIN_HASH_QUEUE=0)
+    h = PasswordHasher()
+    h.init_app(app_ctx)
+    h.timeout = 0.05
+    yield h
+    h._pool.shutdown(wait=False)
+    app_ctx.config.update(saved)
+    app_ctx.extensions["password_hasher"] = password_hasher
+
+
+def test_timeout_is_login_busy_and_keeps_slot_until_done(hasher):
+    release = threading.Event()
+
+    with pytest.raises(LoginBusy):
+        hasher._run(release.wait)
+    # il calcolo scaduto occupa ancora l'unico slot
+    with pytest.raises(LoginBusy):
+        hasher._run(lambda: 1)
+
+    release.set()
+    hasher._pool.submit(lambda: None).result(timeout=1)
+    assert hasher._run(lambda: 42) == 42
+
+
+def _login(client, password):
+    return client.post("/", data={"username": "test", "password": password})
+
+
+def test_only_failed_logins_are_rate_limited(client, restaurant):
+    from app import app
+
+    burst = int(app.config["LOGIN_BURST"])
+    password_hasher.limiter._buckets.clear()
+
+    # accessi riusciti dallo stesso IP (tablet dietro un NAT): mai bloccati
+    for _ in range(burst + 3):
+        res = _login(client, "test")
+        assert res.headers["Location"].endswith("/dashboard")
+        client.get("/logout")
+
+    for _ in range(burst):
+        _login(client, "sbagliata")
+    res = _login(client, "test")
+    assert not res.headers["Location"].endswith("/dashboard")
+    password_hasher.limiter._buckets.clear()
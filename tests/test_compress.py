@@ -0,0 +1,79 @@
+import gzip
+
+import pytest
+from flask import Flask, Response, jsonify
+
+from backend import compress
+from backend.compress import accepted_encodings, choose_encoding
+
+
+def test_accepted_encodings_parses_q_values():
+    assert accepted_encodings("gzip, br;q=0.9, *;q=0") == {"gzip": 1.0, "br": 0.9, "*": 0.0}
+    assert accepted_encodings("gzip;q=abc") == {"gzip": 0.0}
+    assert accepted_encodings("") == {}
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, br", "br"),               # a parità di q vince l'ordine di `available`
+    ("gzip, br;q=0.5", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("*", "br"),
+    ("*;q=0.1, br;q=0", "gzip"),
+    ("gzip;q=0", None),
+    ("identity", None),
+    ("", None),
+])
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header, ("br", "gzip")) == expected
+
+
+@pytest.fixture()
+def client():
+    app = Flask(__name__)
+    app.config["COMPRESS_MIN_SIZE"] = 100
+    compress.init_app(app)
+
+    @app.get("/big")
+    def big():
+        return jsonify(items=["prenotazione"] * 50)
+
+    @app.get("/small")
+    def small():
+        return jsonify(ok=True)
+
+    @app.get("/encoded")
+    def encoded():
+        body = gzip.compress(b"x" * 500)
+        return Response(body, mimetype="application/json", headers={"Content-Encoding": "gzip"})
+
+    return app.test_client()
+
+
+def _get(client, path, accept):
+    return client.get(path, headers={"Accept-Encoding": accept})
+
+
+def test_large_json_is_gzipped(client):
+    plain = _get(client, "/big", "identity")
+    res = _get(client, "/big", "gzip")
+    assert res.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in res.headers["Vary"]
+    assert gzip.decompress(res.get_data()) == plain.get_data()
+
+
+def test_wildcard_and_refused_encodings(client):
+    expected = "br" if compress.brotli is not None else "gzip"
+    assert _get(client, "/big", "*").headers["Content-Encoding"] == expected
+    assert "Content-Encoding" not in _get(client, "/big", "gzip;q=0, br;q=0").headers
+
+
+def test_below_threshold_is_left_alone(client):
+    res = _get(client, "/small", "gzip")
+    assert "Content-Encoding" not in res.headers
+    assert res.get_json() == {"ok": True}
+
+
+def test_already_encoded_response_is_not_recompressed(client):
+    res = _get(client, "/encoded", "gzip")
+    assert res.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(res.get_data()) == b"x" * 500
@@ -0,0 +1,40 @@
+from datetime import date, time
+
+
+def test_dashboard_renders_for_logged_user(logged_client, restaurant):
+    from app import db, Reservation
+
+    db.session.add(Reservation(restaurant_id=restaurant.id, date=date.today(), time=time(20, 0),
+                               name="Rossi", people=4))
+    db.session.commit()
+
+    res = logged_client.get("/dashboard")
+    assert res.status_code == 200
+    body = res.get_data(as_text=True)
+    assert 'id="bootstrapData"' in body
+    assert "Rossi" in body
+
+
+def test_bootstrap_api(logged_client, restaurant):
+    from app import db, Reservation
+
+    today = date.today()
+    db.session.add_all([
+        Reservation(restaurant_id=restaurant.id, date=today, time=time(13, 0), name="A", people=2),
+        Reservation(restaurant_id=restaurant.id, date=today, time=time(20, 30), name="B", people=3),
+    ])
+    db.session.commit()
+
+    js = logged_client.get("/api/bootstrap").get_json()
+    assert js["ok"] is True
+    assert js["day"] == today.isoformat()
+    assert [r["time"] for r in js["reservations"]] == ["13:00", "20:30"]
+    assert js["stats"]["today_count"] == 2
+    assert js["stats"]["estimated_revenue"] == 2 * 20 + 3 * 35
+
+    assert logged_client.get("/api/bootstrap?date=ieri").status_code == 400
+
+
+def test_dashboard_requires_login(client):
+    res = client.get("/dashboard")
+    assert res.status_code == 302
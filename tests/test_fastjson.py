@@ -0,0 +1,47 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from flask import Flask, jsonify
+
+from backend.fastjson import FastJSONProvider
+
+pytest.importorskip("orjson")
+
+
+@pytest.fixture()
+def apps():
+    fast = Flask("fast")
+    fast.json = FastJSONProvider(fast)
+    return fast, Flask("stdlib")
+
+
+def _body(app, payload):
+    with app.app_context():
+        return jsonify(payload).get_data()
+
+
+def test_jsonify_matches_stdlib(apps):
+    fast, stdlib = apps
+    payload = {
+        "ok": True,
+        "items": [{"id": 1, "name": "Caffè Roma", "people": 4, "note": None}],
+        "stats": {"avg": 2.75, "total": 10 ** 12},
+        "price": Decimal("12.50"),
+    }
+    assert json.loads(_body(fast, payload)) == json.loads(_body(stdlib, payload))
+
+
+def test_dates_are_iso_8601(apps):
+    fast, stdlib = apps
+    payload = {"day": date(2025, 10, 1), "at": datetime(2025, 10, 1, 20, 0)}
+
+    assert json.loads(_body(fast, payload)) == {"day": "2025-10-01", "at": "2025-10-01T20:00:00"}
+    # il provider di default usa invece il formato HTTP date
+    assert json.loads(_body(stdlib, payload))["day"] == "Wed, 01 Oct 2025 00:00:00 GMT"
+
+
+def test_big_int_falls_back_to_stdlib(apps):
+    fast, _ = apps
+    assert json.loads(_body(fast, {"n": 2 ** 70})) == {"n": 2 ** 70}
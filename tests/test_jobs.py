@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+
+def _insert_running(conn, locked_at, attempts=1, max_attempts=5):
+    return conn.execute(text(
+        "INSERT INTO job_queue (kind, payload, status, attempts, max_attempts, run_at, locked_at) "
+        "VALUES ('system_log', '{}', 'running', :a, :m, :t, :t) RETURNING id"
+    ), {"a": attempts, "m": max_attempts, "t": locked_at}).scalar()
+
+
+def test_recover_stale_only_touches_jobs_without_heartbeat(app_ctx, job_queue):
+    from app import db
+    from backend.jobs import STALE_LOCK_SECONDS, recover_stale
+
+    now = datetime.utcnow()
+    old = now - timedelta(seconds=STALE_LOCK_SECONDS + 60)
+    with db.engine.begin() as conn:
+        alive = _insert_running(conn, now - timedelta(seconds=30))
+        dead = _insert_running(conn, old)
+        exhausted = _insert_running(conn, old, attempts=5, max_attempts=5)
+        assert recover_stale(conn) == 2
+        status = dict(conn.execute(text("SELECT id, status FROM job_queue")).fetchall())
+
+    assert status == {alive: "running", dead: "queued", exhausted: "failed"}
+
+
+def test_heartbeat_refreshes_locked_at(app_ctx, job_queue):
+    from app import db
+    from backend.jobs import _Heartbeat
+
+    old = datetime.utcnow() - timedelta(hours=1)
+    with db.engine.begin() as conn:
+        jid = _insert_running(conn, old)
+
+    hb = _Heartbeat(db.engine, [jid], every=0.01)
+    with hb:
+        hb._stop.wait(0.1)
+
+    with db.engine.begin() as conn:
+        locked_at = conn.execute(text("SELECT locked_at FROM job_queue WHERE id = :id"), {"id": jid}).scalar()
+    assert str(locked_at) > str(old)
@@ -0,0 +1,31 @@
+from sqlalchemy import event, text
+
+
+def test_insert_system_logs_is_one_multirow_statement(app_ctx):
+    from app import db
+    from backend.log_buffer import insert_system_logs
+
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO system_log"):
+            statements.append((statement, executemany))
+
+    with db.engine.begin() as conn:
+        conn.execute(text("CREATE TABLE system_log (id INTEGER PRIMARY KEY, event VARCHAR(120), "
+                          "detail TEXT, created_at TIMESTAMP)"))
+    event.listen(db.engine, "before_cursor_execute", _count)
+    try:
+        with db.engine.begin() as conn:
+            insert_system_logs(conn, [("a", "1"), ("b", "2"), ("c", "3")])
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _count)
+
+    with db.engine.begin() as conn:
+        events = conn.execute(text("SELECT event FROM system_log ORDER BY id")).scalars().all()
+        conn.execute(text("DROP TABLE system_log"))
+
+    assert events == ["a", "b", "c"]
+    assert len(statements) == 1
+    stmt, executemany = statements[0]
+    assert not executemany and stmt.count("(?, ?, ?)") == 3
@@ -0,0 +1,88 @@
+import pytest
+from sqlalchemy import text
+
+from backend.tenancy import tenant_limiter
+
+
+@pytest.fixture()
+def active_calls(app_ctx):
+    # versione SQLite di sql/2025-10-active-calls.sql senza funzioni: la view usa il fallback
+    from app import db
+
+    with db.engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE active_calls (id INTEGER PRIMARY KEY, restaurant_id INTEGER NOT NULL, "
+            "call_sid TEXT NOT NULL UNIQUE, created_at TIMESTAMP, active BOOLEAN NOT NULL DEFAULT 1)"
+        ))
+    yield
+    with db.engine.begin() as conn:
+        conn.execute(text("DROP TABLE active_calls"))
+
+
+@pytest.fixture()
+def limits(app_ctx):
+    """Config temporanea: i bucket vengono ricreati con i nuovi valori."""
+    saved = dict(app_ctx.config)
+
+    def apply(**cfg):
+        app_ctx.config.update(cfg)
+        tenant_limiter.buckets.clear()
+
+    yield apply
+    app_ctx.config.clear()
+    app_ctx.config.update(saved)
+    tenant_limiter.buckets.clear()
+
+
+def _acquire(client, rid, csid, max_calls=3):
+    return client.post("/api/voice/slot/acquire",
+                       json={"restaurant_id": rid, "call_sid": csid, "max": max_calls})
+
+
+def test_exhausted_tenant_gets_429_while_others_pass(client, active_calls, limits):
+    limits(TENANT_BURST=2, TENANT_RATE_PER_MIN=1)
+
+    assert _acquire(client, 1, "CA_a1").status_code == 200
+    assert _acquire(client, 1, "CA_a2").status_code == 200
+    res = _acquire(client, 1, "CA_a3")
+    assert res.status_code == 429
+    assert int(res.headers["Retry-After"]) >= 1
+    assert res.get_json()["ok"] is False
+
+    # un altro ristorante non risente del picco del primo
+    res = _acquire(client, 2, "CA_b1")
+    assert res.status_code == 200
+    assert res.get_json()["overload"] is False
+
+
+@pytest.mark.parametrize("requested, admitted", [(-5, 1), (0, 3), (1000, 2)])
+def test_acquire_clamps_max(client, active_calls, limits, requested, admitted):
+    # 0 / assente -> default 3; negativi -> almeno 1; oltre il tetto -> VOICE_MAX_CALLS_CAP
+    limits(VOICE_MAX_CALLS_CAP=2 if requested == 1000 else 10)
+
+    results = [_acquire(client, 1, f"CA_{i}", requested).get_json()["overload"] for i in range(admitted + 1)]
+    assert results == [False] * admitted + [True]
+
+
+def test_acquire_rejects_non_numeric_max(client, active_calls):
+    assert _acquire(client, 1, "CA_x", "tanti").status_code == 400
+
+
+def test_busy_tenant_is_queued_out_across_scopes(client, active_calls, monkeypatch):
+    # richieste "reservations" in corso per il ristorante 1 occupano la sua quota di thread:
+    # anche la voce dello stesso ristorante aspetta (un solo scheduler per processo)
+    from app import app
+
+    monkeypatch.setattr(tenant_limiter, "timeout", 0.01)
+    scheduler = tenant_limiter.scheduler
+    held = 0
+    while scheduler.acquire("1"):
+        held += 1
+    assert held == app.config["TENANT_MAX_INFLIGHT"]
+    try:
+        res = _acquire(client, 1, "CA_busy")
+        assert res.status_code == 429 and res.headers["Retry-After"] == "1"
+        assert _acquire(client, 2, "CA_free").status_code == 200
+    finally:
+        for _ in range(held):
+            scheduler.release("1")
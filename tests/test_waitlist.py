@@ -0,0 +1,77 @@
+from datetime import date, time
+
+import pytest
+from sqlalchemy import text
+
+
+def test_waitlist_promoted_when_reservation_is_cancelled(logged_client, restaurant, job_queue):
+    from app import db, Reservation, WaitlistEntry
+
+    day = date(2030, 5, 10)
+    big = Reservation(restaurant_id=restaurant.id, date=day, time=time(20, 0), name="Gruppo", people=8)
+    db.session.add(big)
+    db.session.commit()
+
+    js = logged_client.post("/api/waitlist", json={
+        "date": "2030-05-10", "time": "20:15", "name": "Bianchi", "people": 4,
+    }).get_json()
+    assert js["ok"] is True and js["promoted"] is False
+
+    items = logged_client.get("/api/waitlist?date=2030-05-10").get_json()["items"]
+    assert [(w["name"], w["time"]) for w in items] == [("Bianchi", "20:15")]
+
+    res = logged_client.put(f"/api/reservations/{big.id}", json={"status": "CANCELLED"}).get_json()
+    assert res["waitlist_promoted"] == [js["id"]]
+
+    w = db.session.get(WaitlistEntry, js["id"])
+    assert w.status == "PROMOTED"
+    r = db.session.get(Reservation, w.reservation_id)
+    assert (r.date, r.time, r.people) == (day, time(20, 15), 4)
+    kinds = db.session.execute(text("SELECT kind FROM job_queue")).scalars().all()
+    assert kinds == ["waitlist.promoted"]
+
+
+def test_waitlist_promoted_when_reservation_is_deleted(logged_client, restaurant, job_queue):
+    from app import db, Reservation
+
+    day = date(2030, 5, 10)
+    big = Reservation(restaurant_id=restaurant.id, date=day, time=time(13, 0), name="Gruppo", people=9)
+    db.session.add(big)
+    db.session.commit()
+    wid = logged_client.post("/api/waitlist", json={
+        "date": "2030-05-10", "time": "13:00", "name": "Neri", "people": 2,
+    }).get_json()["id"]
+
+    res = logged_client.delete(f"/api/reservations/{big.id}").get_json()
+    assert res["waitlist_promoted"] == [wid]
+    assert [r.name for r in Reservation.query.all()] == ["Neri"]
+
+
+def test_promotion_checks_the_candidate_own_window(logged_client, restaurant, job_queue):
+    # capacity_max=10, finestra 30': A 20:00 x4, B 20:45 x10, in attesa W 20:30 x4
+    from app import db, Reservation, WaitlistEntry
+
+    day = date(2030, 5, 10)
+    a = Reservation(restaurant_id=restaurant.id, date=day, time=time(20, 0), name="A", people=4)
+    db.session.add_all([a, Reservation(restaurant_id=restaurant.id, date=day, time=time(20, 45),
+                                       name="B", people=10)])
+    db.session.commit()
+    wid = logged_client.post("/api/waitlist", json={
+        "date": "2030-05-10", "time": "20:30", "name": "W", "people": 4,
+    }).get_json()["id"]
+
+    res = logged_client.delete(f"/api/reservations/{a.id}").get_json()
+    # la finestra [20:00, 21:00] di W contiene ancora i 10 coperti di B
+    assert res["waitlist_promoted"] == []
+    assert db.session.get(WaitlistEntry, wid).status == "WAITING"
+
+
+@pytest.mark.parametrize("people", [0, -3, 2.5, "4", None, True])
+def test_waitlist_rejects_invalid_people(logged_client, restaurant, job_queue, people):
+    from app import WaitlistEntry
+
+    res = logged_client.post("/api/waitlist", json={
+        "date": "2030-05-10", "time": "20:00", "name": "Verdi", "people": people,
+    })
+    assert res.status_code == 400
+    assert WaitlistEntry.query.count() == 0